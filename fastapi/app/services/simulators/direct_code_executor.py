@@ -1,6 +1,7 @@
 import ast
 import json
 import re
+from dataclasses import replace
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
@@ -91,7 +92,7 @@ class DirectCodeExecutor:
             if hasattr(result, 'stdout') and result.stdout:
                 if "__WAITING_FOR_INPUT__:" in result.stdout:
                     parts = result.stdout.split("__WAITING_FOR_INPUT__:")
-                    result.stdout = parts[0] # Remove signal from displayed stdout
+                    result = replace(result, stdout=parts[0]) # Remove signal from displayed stdout
                     try:
                         waiting_signal = json.loads(parts[1].strip())
                     except:
@@ -254,6 +255,7 @@ class DirectCodeExecutor:
         # [NEW] If trace data is available, use it to generate detailed steps
         if isinstance(result, InteractiveExecutionResult) and hasattr(result, 'trace') and result.trace:
             code_lines = code.split('\n')
+            explanation_gen = ExplanationGenerator(data_structure_type)
             
             # Map trace steps to ExecutionStepSchema
             for trace_step in result.trace:
@@ -1010,7 +1012,6 @@ class DirectCodeExecutor:
                 # Generate Thai explanation for this step
                 try:
                     prev_step_state = steps[-1].state if steps else None
-                    explanation_gen = ExplanationGenerator(data_structure_type)
                     explanation = explanation_gen.generate_explanation(
                         code_line=current_code,
                         operation=state["step_detail"].get("operation"),
@@ -7,7 +7,10 @@ from typing import Optional, Dict, Any, List, Union
 from dataclasses import dataclass, field
 from app.services.simulators.real_python_executor import RealPythonExecutor, ExecutionResult
 
-@dataclass
+# The trace is sent back on stdout as one JSON document; the bundled examples produce tens of MB
+_MAX_TRACE_OUTPUT_BYTES = 256 << 20
+
+@dataclass(slots=True, frozen=True)
 class InteractiveExecutionResult(ExecutionResult):
     """Result of interactive Python code execution"""
     trace: List[Dict[str, Any]] = field(default_factory=list)
@@ -18,6 +21,9 @@ class InteractivePythonExecutor(RealPythonExecutor):
     Executes Python code with interactive capabilities and tracing
     """
     
+    def __init__(self, *args, max_output_bytes: int = _MAX_TRACE_OUTPUT_BYTES, **kwargs):
+        super().__init__(*args, max_output_bytes=max_output_bytes, **kwargs)
+    
     def execute_interactive(
         self, 
         code: str, 
@@ -12,7 +12,8 @@ class EnhancedOperationParser:
     def __init__(self, context: Dict[str, Any]):
         self.context = context
         self.node_manager = NodeManager(context)
-        self.print_handler = PrintHandler(context)
+        # The linked list step factories build their own state
+        self.print_handler = PrintHandler(context, step_state=False)
         
         # Initialize behavior analyzer and parse any existing classes
         self.behavior_analyzer = BehaviorAnalyzer(context)
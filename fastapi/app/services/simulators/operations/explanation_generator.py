@@ -3,9 +3,52 @@ Explanation Generator - Generates Thai explanations for code execution steps
 ช่วยอธิบายการทำงานของโค้ดทีละบรรทัดให้ผู้เรียนเข้าใจ
 """
 import re
+from enum import IntEnum
 from typing import Dict, Any, Optional, List
 
 
+class VC(IntEnum):
+    """Index of visual change explanations in ``_VC_STRINGS``."""
+    NODE_ADDED = 0
+    NODE_REMOVED = 1
+    POINTER_CHANGED = 2
+    HIGHLIGHT_CURRENT = 3
+    STACK_GROW = 4
+    STACK_SHRINK = 5
+    QUEUE_GROW = 6
+    QUEUE_SHRINK = 7
+
+
+# Visual change explanations (indexed by VC)
+_VC_STRINGS = (
+    'มี node ใหม่ปรากฏใน visualization เพราะกำลังสร้าง node ใหม่',
+    'node หายไปจาก visualization เพราะถูกลบออก',
+    'ลูกศร (pointer) เปลี่ยน เพราะกำลังเปลี่ยนการเชื่อมต่อ',
+    'node ถูก highlight เพราะกำลังถูก access หรือ traverse',
+    'Stack สูงขึ้น เพราะมี element ใหม่ถูก push เข้าไป',
+    'Stack เตี้ยลง เพราะ element ถูก pop ออกไป',
+    'Queue ยาวขึ้น เพราะมี element ใหม่เข้าแถว',
+    'Queue สั้นลง เพราะ element ออกจากหัวแถว',
+)
+
+# Operation name -> visual change category, for exact (lowercased) names
+_OP_CATEGORY = {
+    'insert': 'add',
+    'push': 'add',
+    'add': 'add',
+    'enqueue': 'add',
+    'delete': 'remove',
+    'pop': 'remove',
+    'remove': 'remove',
+    'dequeue': 'remove',
+    'traverse': 'highlight',
+    'search': 'highlight',
+}
+
+# Substring fallback for compound names (e.g. insertfront), checked in priority order
+_OP_KEYWORDS = tuple(_OP_CATEGORY.items())
+
+
 class ExplanationGenerator:
     """
     Generate Thai explanations for code execution steps.
@@ -45,6 +88,11 @@ class ExplanationGenerator:
         r'^def\s+(\w+)\((.*)\):$': 'function_def',
     }
     
+    # PATTERNS compiled once, in declaration order
+    _COMPILED_PATTERNS = tuple(
+        (re.compile(pattern), pattern_type) for pattern, pattern_type in PATTERNS.items()
+    )
+    
     # Thai explanations for data structure operations
     DS_OPERATIONS = {
         'stack': {
@@ -87,18 +135,6 @@ class ExplanationGenerator:
         },
     }
     
-    # Visual change explanations
-    VISUAL_CHANGES = {
-        'node_added': 'มี node ใหม่ปรากฏใน visualization เพราะกำลังสร้าง node ใหม่',
-        'node_removed': 'node หายไปจาก visualization เพราะถูกลบออก',
-        'pointer_changed': 'ลูกศร (pointer) เปลี่ยน เพราะกำลังเปลี่ยนการเชื่อมต่อ',
-        'highlight_current': 'node ถูก highlight เพราะกำลังถูก access หรือ traverse',
-        'stack_grow': 'Stack สูงขึ้น เพราะมี element ใหม่ถูก push เข้าไป',
-        'stack_shrink': 'Stack เตี้ยลง เพราะ element ถูก pop ออกไป',
-        'queue_grow': 'Queue ยาวขึ้น เพราะมี element ใหม่เข้าแถว',
-        'queue_shrink': 'Queue สั้นลง เพราะ element ออกจากหัวแถว',
-    }
-
     def __init__(self, data_structure_type: Optional[str] = None):
         """
         Initialize the explanation generator.
@@ -107,6 +143,7 @@ class ExplanationGenerator:
             data_structure_type: Type of data structure (stack, queue, linkedlist, etc.)
         """
         self.data_structure_type = data_structure_type or 'general'
+        self._ds_type_norm = self._normalize_ds_type(self.data_structure_type)
     
     def generate_explanation(
         self,
@@ -133,6 +170,7 @@ class ExplanationGenerator:
                 - concept: อธิบาย concept ที่เกี่ยวข้อง
         """
         code_line = code_line.strip()
+        op_lower = operation.lower() if operation else None
         
         # Detect code pattern
         pattern_type, match_groups = self._detect_pattern(code_line)
@@ -142,11 +180,11 @@ class ExplanationGenerator:
         
         # Generate "why visual changed" explanation
         why_visual = self._generate_visual_explanation(
-            operation, pattern_type, match_groups, prev_state, curr_state
+            op_lower, pattern_type, match_groups, prev_state, curr_state
         )
         
         # Generate "concept" explanation
-        concept = self._generate_concept_explanation(operation, pattern_type, match_groups)
+        concept = self._generate_concept_explanation(op_lower, pattern_type, match_groups)
         
         return {
             'what': what,
@@ -154,10 +192,44 @@ class ExplanationGenerator:
             'concept': concept,
         }
     
+    def generate_explanations(self, steps: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """
+        Generate Thai explanations for many code lines in one call.
+        
+        Args:
+            steps: List of dicts with 'code_line' and optionally 'operation',
+                'variables', 'prev_state' and 'curr_state' (same meaning as
+                the arguments of generate_explanation)
+            
+        Returns:
+            List of explanation dicts, one per step, in the same order
+        """
+        detect_pattern = self._detect_pattern
+        what_explanation = self._generate_what_explanation
+        visual_explanation = self._generate_visual_explanation
+        concept_explanation = self._generate_concept_explanation
+        
+        explanations = []
+        append = explanations.append
+        for step in steps:
+            code_line = step['code_line'].strip()
+            operation = step.get('operation')
+            op_lower = operation.lower() if operation else None
+            pattern_type, match_groups = detect_pattern(code_line)
+            append({
+                'what': what_explanation(code_line, pattern_type, match_groups, step.get('variables')),
+                'why_visual': visual_explanation(
+                    op_lower, pattern_type, match_groups,
+                    step.get('prev_state'), step.get('curr_state'),
+                ),
+                'concept': concept_explanation(op_lower, pattern_type, match_groups),
+            })
+        return explanations
+    
     def _detect_pattern(self, code_line: str) -> tuple:
         """Detect the pattern type of the code line."""
-        for pattern, pattern_type in self.PATTERNS.items():
-            match = re.match(pattern, code_line)
+        for pattern, pattern_type in self._COMPILED_PATTERNS:
+            match = pattern.match(code_line)
             if match:
                 return pattern_type, match.groups()
         return 'unknown', ()
@@ -197,19 +269,19 @@ class ExplanationGenerator:
             return f"กำหนดค่า {value} ให้กับ attribute '{attr_name}' ของ '{obj_name}'"
         
         elif pattern_type == 'print':
-            content = match_groups[0] if match_groups else ''
+            content = match_groups[0]
             return f"แสดงผลลัพธ์: {content}"
         
         elif pattern_type == 'return':
-            value = match_groups[0] if match_groups else ''
+            value = match_groups[0]
             return f"ส่งค่า {value} กลับออกจากฟังก์ชัน"
         
         elif pattern_type == 'if_statement':
-            condition = match_groups[0] if match_groups else ''
+            condition = match_groups[0]
             return f"ตรวจสอบเงื่อนไข: {condition}"
         
         elif pattern_type == 'while_loop':
-            condition = match_groups[0] if match_groups else ''
+            condition = match_groups[0]
             return f"วนซ้ำตราบเท่าที่: {condition}"
         
         elif pattern_type == 'for_loop':
@@ -217,7 +289,7 @@ class ExplanationGenerator:
             return f"วนซ้ำโดยให้ '{var_name}' รับค่าจาก {iterable} ทีละตัว"
         
         elif pattern_type == 'class_def':
-            class_name = match_groups[0] if match_groups else ''
+            class_name = match_groups[0]
             return f"ประกาศ class ชื่อ '{class_name}'"
         
         elif pattern_type == 'function_def':
@@ -234,7 +306,7 @@ class ExplanationGenerator:
         method_lower = method_name.lower()
         
         # Check if we have a specific explanation for this method
-        ds_type = self._normalize_ds_type(self.data_structure_type)
+        ds_type = self._ds_type_norm
         
         if ds_type in self.DS_OPERATIONS:
             for method_key, explanation in self.DS_OPERATIONS[ds_type].items():
@@ -270,15 +342,15 @@ class ExplanationGenerator:
     
     def _generate_visual_explanation(
         self,
-        operation: Optional[str],
+        op_lower: Optional[str],
         pattern_type: str,
         match_groups: tuple,
         prev_state: Optional[Dict[str, Any]] = None,
         curr_state: Optional[Dict[str, Any]] = None,
     ) -> str:
-        """Generate explanation for why visualization changed."""
+        """Generate explanation for why visualization changed (op_lower is already lowercased)."""
         
-        ds_type = self._normalize_ds_type(self.data_structure_type)
+        ds_type = self._ds_type_norm
         
         # Detect visual changes based on states
         if prev_state and curr_state:
@@ -287,33 +359,36 @@ class ExplanationGenerator:
                 return visual_change
         
         # Generate based on operation type
-        if operation:
-            op_lower = operation.lower()
+        if op_lower:
+            category = _OP_CATEGORY.get(op_lower)
+            if category is None:
+                for keyword, keyword_category in _OP_KEYWORDS:
+                    if keyword in op_lower:
+                        category = keyword_category
+                        break
             
-            if 'insert' in op_lower or 'push' in op_lower or 'add' in op_lower or 'enqueue' in op_lower:
+            if category == 'add':
                 if ds_type == 'stack':
-                    return self.VISUAL_CHANGES['stack_grow']
+                    return _VC_STRINGS[VC.STACK_GROW]
                 elif ds_type == 'queue':
-                    return self.VISUAL_CHANGES['queue_grow']
-                else:
-                    return self.VISUAL_CHANGES['node_added']
+                    return _VC_STRINGS[VC.QUEUE_GROW]
+                return _VC_STRINGS[VC.NODE_ADDED]
             
-            elif 'delete' in op_lower or 'pop' in op_lower or 'remove' in op_lower or 'dequeue' in op_lower:
+            elif category == 'remove':
                 if ds_type == 'stack':
-                    return self.VISUAL_CHANGES['stack_shrink']
+                    return _VC_STRINGS[VC.STACK_SHRINK]
                 elif ds_type == 'queue':
-                    return self.VISUAL_CHANGES['queue_shrink']
-                else:
-                    return self.VISUAL_CHANGES['node_removed']
+                    return _VC_STRINGS[VC.QUEUE_SHRINK]
+                return _VC_STRINGS[VC.NODE_REMOVED]
             
-            elif 'traverse' in op_lower or 'search' in op_lower:
-                return self.VISUAL_CHANGES['highlight_current']
+            elif category == 'highlight':
+                return _VC_STRINGS[VC.HIGHLIGHT_CURRENT]
         
         # Check for pointer assignments
         if pattern_type == 'attribute_assign' and len(match_groups) >= 2:
             attr_name = match_groups[1].lower()
             if attr_name in ['next', 'prev', 'left', 'right', 'head', 'tail', 'root']:
-                return self.VISUAL_CHANGES['pointer_changed']
+                return _VC_STRINGS[VC.POINTER_CHANGED]
         
         return ""
     
@@ -330,12 +405,12 @@ class ExplanationGenerator:
         # Check for new instances
         for key in curr_instances:
             if key not in prev_instances:
-                return self.VISUAL_CHANGES['node_added']
+                return _VC_STRINGS[VC.NODE_ADDED]
         
         # Check for removed instances
         for key in prev_instances:
             if key not in curr_instances:
-                return self.VISUAL_CHANGES['node_removed']
+                return _VC_STRINGS[VC.NODE_REMOVED]
         
         # Check for size changes in data structures
         for key in curr_instances:
@@ -344,32 +419,32 @@ class ExplanationGenerator:
                 prev_size = prev_instances[key].get('size', 0)
                 
                 if curr_size > prev_size:
-                    ds_type = self._normalize_ds_type(self.data_structure_type)
+                    ds_type = self._ds_type_norm
                     if ds_type == 'stack':
-                        return self.VISUAL_CHANGES['stack_grow']
+                        return _VC_STRINGS[VC.STACK_GROW]
                     elif ds_type == 'queue':
-                        return self.VISUAL_CHANGES['queue_grow']
-                    return self.VISUAL_CHANGES['node_added']
+                        return _VC_STRINGS[VC.QUEUE_GROW]
+                    return _VC_STRINGS[VC.NODE_ADDED]
                 
                 elif curr_size < prev_size:
-                    ds_type = self._normalize_ds_type(self.data_structure_type)
+                    ds_type = self._ds_type_norm
                     if ds_type == 'stack':
-                        return self.VISUAL_CHANGES['stack_shrink']
+                        return _VC_STRINGS[VC.STACK_SHRINK]
                     elif ds_type == 'queue':
-                        return self.VISUAL_CHANGES['queue_shrink']
-                    return self.VISUAL_CHANGES['node_removed']
+                        return _VC_STRINGS[VC.QUEUE_SHRINK]
+                    return _VC_STRINGS[VC.NODE_REMOVED]
         
         return ""
     
     def _generate_concept_explanation(
         self,
-        operation: Optional[str],
+        op_lower: Optional[str],
         pattern_type: str,
         match_groups: tuple,
     ) -> str:
         """Generate concept explanation related to the operation."""
         
-        ds_type = self._normalize_ds_type(self.data_structure_type)
+        ds_type = self._ds_type_norm
         
         if ds_type == 'stack':
             return "Stack ทำงานแบบ LIFO (Last In, First Out) - ข้อมูลที่ใส่เข้าไปทีหลังจะถูกนำออกก่อน"
@@ -1,15 +1,47 @@
+import sys
 from typing import Dict, Any
 from app.utils.messages_th import (
     get_instance_created_message, get_node_created_message, get_insert_message,
     get_delete_message, get_error_message, get_message
 )
 
+_MISSING = object()
+
 
 class NodeManager:
     """Manages node creation and linked list instance operations with enhanced tracking"""
     
     def __init__(self, context: Dict[str, Any]):
         self.context = context
+        # Validate the containers every operation reads once, so methods can trust their shape
+        for key in ("nodes", "instances", "variables"):
+            if not isinstance(context.get(key), dict):
+                context[key] = {}
+        # Shared by every manager on this context; start past any existing nodes
+        context.setdefault("_next_node_id", len(context["nodes"]))
+        # Bumped on every head/next link change; link indexes and cached traversals check it
+        context.setdefault("_link_version", 0)
+    
+    def _new_node_id(self) -> str:
+        """Allocate a node id that is never reused, even after deletions"""
+        i = self.context["_next_node_id"]
+        self.context["_next_node_id"] = i + 1
+        # Ids stay "node_N" strings: they are the node keys in serialized state and live in
+        # variables next to user values, where an int id would be mistaken for a number.
+        # Interning keeps lookups cheap since the hash is cached and equality is an identity check.
+        return sys.intern(f"node_{i}")
+    
+    def _links_changed(self, instance: Dict[str, Any] = None) -> None:
+        """
+        Invalidate cached traversals and link indexes after a head or next link changed
+
+        instance is the list whose own index was already updated for the change; lists can
+        share nodes, so every other list's index goes stale and is rebuilt on its next use.
+        """
+        version = self.context["_link_version"] + 1
+        self.context["_link_version"] = version
+        if instance is not None and instance.get("name_index") is not None:
+            instance["index_version"] = version
     
     def create_instance_data(self, class_name: str) -> Dict[str, Any]:
         """Create new instance data structure"""
@@ -19,35 +51,42 @@ class NodeManager:
             "count": 0,
             "class_type": class_name,
             "attributes": {},
-            "initialized": True
+            "initialized": True,
+            "tail": None,
+            "name_index": {},  # node name -> [node_ids] reachable from head
+            "prev_map": {},  # node_id -> predecessor node_id (None for head)
+            "index_version": None  # _link_version the index was built for
         }
     
     def create_node_data(self, class_name: str, name: str = "") -> Dict[str, Any]:
         """Create node data structure"""
-        node_data = {
+        # Interned so name comparisons and name_index lookups hit the identity fast path
+        if isinstance(name, str):
+            name = sys.intern(name)
+        # Built as a single literal: adding "prev" afterwards would grow the dict past its initial size
+        if class_name == "DataNode":
+            # DataNode also carries prev for doubly linked lists
+            return {
+                "class_type": class_name,
+                "name": name,
+                "next": None,
+                "prev": None,
+                "attributes": {"name": name},
+                "created_at": None
+            }
+        return {
             "class_type": class_name,
             "name": name,
             "next": None,
             "attributes": {"name": name},
             "created_at": None
         }
-        # Add prev for doubly linked list nodes
-        if class_name == "DataNode":
-            node_data["prev"] = None
-        return node_data
     
     def create_instance(self, var_name: str, class_name: str) -> str:
         """Create a new instance of a class with proper initialization tracking"""
-        # Ensure instances dict exists
-        if "instances" not in self.context:
-            self.context["instances"] = {}
-        
         if class_name in ["SinglyLinkedList", "DoublyLinkedList"]:
             # Create instance with explicit initialization
             instance_data = self.create_instance_data(class_name)
-            # Add tail for doubly linked list
-            if class_name == "DoublyLinkedList":
-                instance_data["tail"] = None
             self.context["instances"][var_name] = instance_data
             self.context["active_instance"] = var_name
             
@@ -59,12 +98,7 @@ class NodeManager:
             
         elif class_name == "DataNode":
             # This shouldn't happen with DataNode() - it needs a parameter
-            if "nodes" not in self.context:
-                self.context["nodes"] = {}
-            if "variables" not in self.context:
-                self.context["variables"] = {}
-                
-            node_id = f"node_{len(self.context['nodes'])}"
+            node_id = self._new_node_id()
             self.context["nodes"][node_id] = self.create_node_data(class_name)
             self.context["variables"][var_name] = node_id
             return get_instance_created_message(class_name, var_name)
@@ -73,34 +107,26 @@ class NodeManager:
     
     def create_node(self, var_name: str, node_name: str) -> str:
         """Create a new DataNode with a name"""
-        # Ensure required dicts exist  
-        if "nodes" not in self.context:
-            self.context["nodes"] = {}
-        if "variables" not in self.context:
-            self.context["variables"] = {}
-            
-        node_id = f"node_{len(self.context['nodes'])}"
-        node_data = self.create_node_data("DataNode", node_name)
-        self.context["nodes"][node_id] = node_data
+        nodes = self.context["nodes"]
+        node_id = self._new_node_id()
+        nodes[node_id] = self.create_node_data("DataNode", node_name)
         self.context["variables"][var_name] = node_id
         return get_node_created_message(var_name, node_name)
     
     def set_attribute(self, instance_name: str, attribute: str, value_var: str) -> str:
         """Set an attribute of an instance"""
-        instances = self.context.get("instances", {})
-        variables = self.context.get("variables", {})
-        
-        if not isinstance(instances, dict) or instance_name not in instances:
+        instance = self.context["instances"].get(instance_name)
+        if instance is None:
             raise ValueError(get_error_message("instance_not_found", instance_name=instance_name))
-        if not isinstance(variables, dict) or value_var not in variables:
+        node_id = self.context["variables"].get(value_var, _MISSING)
+        if node_id is _MISSING:
             raise ValueError(get_error_message("variable_not_found", var_name=value_var))
         
-        instance = instances[instance_name]
-        node_id = variables[value_var]
-        
         if attribute == "head":
             old_head = instance.get("head")
             instance["head"] = node_id
+            instance["name_index"] = None  # links changed outside insert/delete
+            self._links_changed()
             self.context["active_instance"] = instance_name
             
             if old_head is None:
@@ -112,45 +138,34 @@ class NodeManager:
     
     def set_chained_attribute(self, instance_name: str, value_var: str) -> str:
         """Set a chained attribute like mylist.head.next"""
-        instances = self.context.get("instances", {})
-        variables = self.context.get("variables", {})
-        nodes = self.context.get("nodes", {})
-        
-        if not isinstance(instances, dict) or instance_name not in instances:
+        instance = self.context["instances"].get(instance_name)
+        if instance is None:
             raise ValueError(get_error_message("instance_not_found", instance_name=instance_name))
-        if not isinstance(variables, dict) or value_var not in variables:
+        value = self.context["variables"].get(value_var, _MISSING)
+        if value is _MISSING:
             raise ValueError(get_error_message("variable_not_found", var_name=value_var))
-        if not isinstance(nodes, dict):
-            raise ValueError(get_error_message("nodes_corrupted"))
         
-        instance = instances[instance_name]
-        if instance["head"] and instance["head"] in nodes:
-            head_node = nodes[instance["head"]]
-            if isinstance(head_node, dict):
-                head_node["next"] = variables[value_var]
-                return get_message("chained_attribute_set", instance_name=instance_name, value_var=value_var)
+        head_node = self.context["nodes"].get(instance["head"]) if instance["head"] else None
+        if head_node is not None:
+            head_node["next"] = value
+            instance["name_index"] = None  # links changed outside insert/delete
+            self._links_changed()
+            return get_message("chained_attribute_set", instance_name=instance_name, value_var=value_var)
         
         return get_message("chained_attribute_failed", instance_name=instance_name, value_var=value_var)
     
     def set_prev_attribute(self, node_var: str, instance_name: str) -> str:
         """Set prev attribute of a node to instance's head (for doubly linked list)"""
-        instances = self.context.get("instances", {})
-        variables = self.context.get("variables", {})
-        nodes = self.context.get("nodes", {})
-        
-        if not isinstance(instances, dict) or instance_name not in instances:
+        instance = self.context["instances"].get(instance_name)
+        if instance is None:
             raise ValueError(get_error_message("instance_not_found", instance_name=instance_name))
-        if not isinstance(variables, dict) or node_var not in variables:
+        node_id = self.context["variables"].get(node_var, _MISSING)
+        if node_id is _MISSING:
             raise ValueError(get_error_message("variable_not_found", var_name=node_var))
-        if not isinstance(nodes, dict):
-            raise ValueError(get_error_message("nodes_corrupted"))
-        
-        instance = instances[instance_name]
-        node_id = variables[node_var]
-        head_id = instance.get("head")
         
-        if node_id in nodes and isinstance(nodes[node_id], dict):
-            nodes[node_id]["prev"] = head_id
+        node = self.context["nodes"].get(node_id)
+        if node is not None:
+            node["prev"] = instance.get("head")
             return get_message("prev_attribute_set", node_var=node_var, instance_name=instance_name)
         
         return get_message("prev_attribute_failed", node_var=node_var, instance_name=instance_name)
@@ -159,23 +174,26 @@ class NodeManager:
         """Insert a node at the front of the linked list"""
         if not isinstance(instance, dict):
             raise ValueError(get_error_message("invalid_instance"))
-            
-        # Ensure nodes dict exists
-        if "nodes" not in self.context:
-            self.context["nodes"] = {}
         
         # Create new node
-        node_id = f"node_{len(self.context['nodes'])}"
-        self.context["nodes"][node_id] = self.create_node_data("DataNode", data)
+        nodes = self.context["nodes"]
+        node_id = self._new_node_id()
+        nodes[node_id] = self.create_node_data("DataNode", data)
         
         # Insert at front
         old_head = instance.get("head")
+        name_index, prev_map = self._get_link_index(instance)
+        name_index.setdefault(nodes[node_id]["name"], []).append(node_id)
+        prev_map[node_id] = None
+        self._links_changed(instance)
         if old_head is None:
             instance["head"] = node_id
+            instance["tail"] = node_id
             instance["count"] = 1
             return get_insert_message("first", data)
         else:
-            self.context["nodes"][node_id]["next"] = old_head
+            nodes[node_id]["next"] = old_head
+            prev_map[old_head] = node_id
             instance["head"] = node_id
             instance["count"] += 1
             return get_insert_message("front", data, instance["count"])
@@ -184,99 +202,181 @@ class NodeManager:
         """Insert a node at the end of the linked list"""
         if not isinstance(instance, dict):
             raise ValueError(get_error_message("invalid_instance"))
-            
-        # Ensure nodes dict exists
-        if "nodes" not in self.context:
-            self.context["nodes"] = {}
         
-        node_id = f"node_{len(self.context['nodes'])}"
-        self.context["nodes"][node_id] = self.create_node_data("DataNode", data)
+        nodes = self.context["nodes"]
+        node_id = self._new_node_id()
+        nodes[node_id] = self.create_node_data("DataNode", data)
+        
+        name_index, prev_map = self._get_link_index(instance)
+        name_index.setdefault(nodes[node_id]["name"], []).append(node_id)
+        self._links_changed(instance)
         
         if instance["head"] is None:
             instance["head"] = node_id
+            instance["tail"] = node_id
             instance["count"] = 1
+            prev_map[node_id] = None
             return get_insert_message("first", data)
         else:
-            # Find last node
-            current = instance["head"]
-            nodes = self.context.get("nodes", {})
-            while current and isinstance(nodes.get(current), dict) and nodes[current]["next"]:
-                current = nodes[current]["next"]
-            if current and isinstance(nodes.get(current), dict):
-                nodes[current]["next"] = node_id
+            # Append after the tracked last node
+            tail = instance["tail"]
+            if tail is not None:
+                nodes[tail]["next"] = node_id
+                instance["tail"] = node_id
+            prev_map[node_id] = tail
             
             instance["count"] += 1
             return get_insert_message("last", data, instance["count"])
     
+    def build_from_iterable(self, instance: Dict[str, Any], names) -> str:
+        """Append every name in names to the end of the linked list in a single pass"""
+        if not isinstance(instance, dict):
+            raise ValueError(get_error_message("invalid_instance"))
+        
+        names = list(names)
+        if not names:
+            return get_message("insert_many", count=0, data="")
+        
+        nodes = self.context["nodes"]
+        name_index, prev_map = self._get_link_index(instance)
+        create_node_data = self.create_node_data
+        
+        # Reserve all ids with one counter update
+        first_id = self.context["_next_node_id"]
+        self.context["_next_node_id"] = first_id + len(names)
+        
+        predecessor = instance["tail"]
+        for i, name in enumerate(names, first_id):
+            node_id = sys.intern(f"node_{i}")
+            node = create_node_data("DataNode", name)
+            nodes[node_id] = node
+            if instance["head"] is None:
+                instance["head"] = node_id
+            elif predecessor is not None:
+                nodes[predecessor]["next"] = node_id
+            prev_map[node_id] = predecessor
+            name_index.setdefault(node["name"], []).append(node_id)
+            predecessor = node_id
+        
+        instance["tail"] = predecessor
+        instance["count"] += len(names)
+        self._links_changed(instance)
+        return get_message("insert_many", count=len(names), data=", ".join(str(name) for name in names))
+    
     def insert_before(self, instance: Dict[str, Any], target_name: str, new_data: str) -> str:
         """Insert a node before the target node"""
         if not isinstance(instance, dict):
             raise ValueError(get_error_message("invalid_instance"))
-            
-        # Ensure nodes dict exists
-        if "nodes" not in self.context:
-            self.context["nodes"] = {}
+        if isinstance(target_name, str):
+            target_name = sys.intern(target_name)
         
-        node_id = f"node_{len(self.context['nodes'])}"
-        self.context["nodes"][node_id] = self.create_node_data("DataNode", new_data)
+        nodes = self.context["nodes"]
+        node_id = self._new_node_id()
+        nodes[node_id] = self.create_node_data("DataNode", new_data)
         
-        nodes = self.context.get("nodes", {})
-        if not isinstance(nodes, dict):
-            return get_error_message("nodes_corrupted")
+        name_index, prev_map = self._get_link_index(instance)
+        target_id = self._find_node_by_name(instance, name_index, target_name)
+        if target_id is None:
+            return get_message("target_not_found", target_name=target_name)
         
-        # If inserting before head
-        if (instance["head"] and instance["head"] in nodes and 
-            isinstance(nodes[instance["head"]], dict) and
-            nodes[instance["head"]]["name"] == target_name):
-            nodes[node_id]["next"] = instance["head"]
+        # Splice new node between the target's predecessor and the target
+        predecessor = prev_map[target_id]
+        nodes[node_id]["next"] = target_id
+        if predecessor is None:
             instance["head"] = node_id
-            instance["count"] += 1
-            return get_insert_message("before", new_data, instance["count"], target_name)
         else:
-            # Find the node before target
-            current = instance["head"]
-            while current and current in nodes and isinstance(nodes[current], dict):
-                next_node_id = nodes[current]["next"]
-                if (next_node_id and next_node_id in nodes and 
-                    isinstance(nodes[next_node_id], dict) and
-                    nodes[next_node_id]["name"] == target_name):
-                    nodes[node_id]["next"] = next_node_id
-                    nodes[current]["next"] = node_id
-                    instance["count"] += 1
-                    return get_insert_message("before", new_data, instance["count"], target_name)
-                current = next_node_id
-            
-            return get_message("target_not_found", target_name=target_name)
+            nodes[predecessor]["next"] = node_id
+        prev_map[node_id] = predecessor
+        prev_map[target_id] = node_id
+        name_index.setdefault(nodes[node_id]["name"], []).append(node_id)
+        instance["count"] += 1
+        self._links_changed(instance)
+        return get_insert_message("before", new_data, instance["count"], target_name)
     
     def delete_node(self, instance: Dict[str, Any], target_name: str) -> str:
         """Delete a node with the given name"""
         if not isinstance(instance, dict):
             raise ValueError(get_error_message("invalid_instance"))
+        if isinstance(target_name, str):
+            target_name = sys.intern(target_name)
             
-        nodes = self.context.get("nodes", {})
-        if not isinstance(nodes, dict):
-            return get_error_message("nodes_corrupted")
-        
+        nodes = self.context["nodes"]
         if not instance["head"]:
             return get_message("delete_empty_list", target_name=target_name)
-        elif (instance["head"] in nodes and isinstance(nodes[instance["head"]], dict) and
-              nodes[instance["head"]]["name"] == target_name):
-            # Delete head
-            old_head = instance["head"]
-            instance["head"] = nodes[old_head]["next"]
-            instance["count"] = max(0, instance["count"] - 1)
-            return get_delete_message(target_name, instance["count"], from_head=True)
+        
+        name_index, prev_map = self._get_link_index(instance)
+        target_id = self._find_node_by_name(instance, name_index, target_name)
+        if target_id is None:
+            return get_message("delete_target_not_found", target_name=target_name)
+        
+        # Unlink the target from its predecessor
+        predecessor = prev_map.pop(target_id)
+        next_id = nodes[target_id]["next"]
+        if predecessor is None:
+            instance["head"] = next_id
         else:
-            # Find and delete node
-            current = instance["head"]
-            while current and current in nodes and isinstance(nodes[current], dict):
-                next_node_id = nodes[current]["next"]
-                if (next_node_id and next_node_id in nodes and 
-                    isinstance(nodes[next_node_id], dict) and
-                    nodes[next_node_id]["name"] == target_name):
-                    nodes[current]["next"] = nodes[next_node_id]["next"]
-                    instance["count"] = max(0, instance["count"] - 1)
-                    return get_delete_message(target_name, instance["count"], from_head=False)
-                current = next_node_id
-            
-            return get_message("delete_target_not_found", target_name=target_name)
\ No newline at end of file
+            nodes[predecessor]["next"] = next_id
+        if next_id is not None and next_id in prev_map:
+            prev_map[next_id] = predecessor
+        if instance.get("tail") == target_id:
+            instance["tail"] = predecessor
+        
+        same_name = name_index[target_name]
+        same_name.remove(target_id)
+        if not same_name:
+            del name_index[target_name]
+        
+        instance["count"] = max(0, instance["count"] - 1)
+        self._links_changed(instance)
+        return get_delete_message(target_name, instance["count"], from_head=predecessor is None)
+    
+    def _get_link_index(self, instance: Dict[str, Any]):
+        """Return (name_index, prev_map) for a linked list, rebuilding them and tail if missing or stale"""
+        name_index = instance.get("name_index")
+        prev_map = instance.get("prev_map")
+        version = self.context["_link_version"]
+        nodes = self.context["nodes"]
+        # A different version means links changed through another list or a direct assignment;
+        # a tail with a successor is stale too, and appending through it would cut that link
+        tail = instance.get("tail")
+        tail_node = nodes.get(tail) if tail is not None else None
+        if (name_index is None or prev_map is None or instance.get("index_version") != version
+                or (tail_node is not None and tail_node["next"] is not None)):
+            name_index = {}
+            prev_map = {}
+            predecessor = None
+            current = instance.get("head")
+            while current and current not in prev_map:
+                node = nodes.get(current)
+                if node is None:
+                    break
+                prev_map[current] = predecessor
+                name_index.setdefault(node["name"], []).append(current)
+                predecessor = current
+                current = node["next"]
+            instance["name_index"] = name_index
+            instance["prev_map"] = prev_map
+            instance["tail"] = predecessor
+            instance["index_version"] = version
+        return name_index, prev_map
+    
+    def _find_node_by_name(self, instance: Dict[str, Any], name_index: Dict[str, Any], target_name: str):
+        """Return the id of the first node in list order with the given name, or None"""
+        candidates = name_index.get(target_name)
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+        
+        # Duplicate names: the earliest one in list order wins
+        nodes = self.context["nodes"]
+        candidate_set = set(candidates)
+        current = instance.get("head")
+        while current:
+            if current in candidate_set:
+                return current
+            node = nodes.get(current)
+            if node is None:
+                break
+            current = node["next"]
+        return None
@@ -1,82 +1,154 @@
+import ast
 import re
 from typing import List, Dict, Any
 from app.schemas.playground import ExecutionStepSchema
 
+_PRINT_RE = re.compile(r"print\((.*)\)")
+_METHOD_RE = re.compile(r"(\w+)\.(\w+)\(\)")
+_STRING_START = ('"', "'")
+_MISSING = object()
+# A print argument: quoted strings (unterminated quotes run to the end) or any other non-comma characters
+_ARG_RE = re.compile(r"""(?:"[^"]*"?|'[^']*'?|[^,"'])*""")
+
+
+def _data_str(instance: Dict[str, Any]) -> str:
+    # Queues keep a deque; print it the way the user's list would print
+    return str(list(instance.get("data", [])))
+
+
+def _size_str(instance: Dict[str, Any]) -> str:
+    return str(len(instance.get("data", [])))
+
+
+def _is_empty_str(instance: Dict[str, Any]) -> str:
+    return str(len(instance.get("data", [])) == 0)
+
+
+def _top_str(instance: Dict[str, Any]) -> str:
+    data = instance.get("data", [])
+    return str(data[-1] if data else None)
+
+
+def _pop_str(instance: Dict[str, Any]) -> str:
+    if instance.get("data"):
+        value = instance["data"].pop()
+        # Stacks and queues cache their snapshots until the data changes
+        if "_mutations" in instance:
+            instance["_mutations"] += 1
+        return str(value)
+    return "None"
+
+
+# Attribute name -> evaluator for obj.attr on stack-like instances
+_INSTANCE_ATTR_HANDLERS = {
+    "data": _data_str,
+    "size": _size_str,
+    "isEmpty": _is_empty_str,
+    "is_empty": _is_empty_str,
+    "top": _top_str,
+    "stackTop": _top_str,
+}
+
+# Method behavior category -> evaluator for obj.method() calls
+_METHOD_CATEGORY_HANDLERS = {
+    "size": _size_str,
+    "is_empty": _is_empty_str,
+    "stackTop": _top_str,
+    "pop": _pop_str,
+}
+
+# Priority between categories when analyzed behavior and method name disagree
+_METHOD_CATEGORY_ORDER = {"size": 0, "is_empty": 1, "stackTop": 2, "pop": 3}
+
+# Well-known method names -> behavior category
+_METHOD_CATEGORIES = {
+    "size": "size", "get_size": "size", "count": "size", "__len__": "size",
+    "is_empty": "is_empty", "empty": "is_empty", "isempty": "is_empty",
+    "stackTop": "stackTop", "get_stack_top": "stackTop", "peek": "stackTop", "top": "stackTop", "get_top": "stackTop",
+    "pop": "pop", "remove": "pop", "delete": "pop",
+}
+
 
 class PrintHandler:
     """Enhanced print statement handling with step details for stack visualization"""
     
-    def __init__(self, context: Dict[str, Any]):
+    def __init__(self, context: Dict[str, Any], step_state: bool = True):
+        """
+        Args:
+            context: Shared simulator context
+            step_state: Whether print steps are given their state snapshot, as `state=`; off for
+                step factories shaped (step, line, code, message, error, ...) that build their own
+        """
         self.context = context
+        self.step_state = step_state
+        # expression text -> (is_literal, literal value or compiled code)
+        self._eval_cache: Dict[str, tuple] = {}
+        # Last snapshot taken per container, shared by consecutive steps while unchanged
+        self._snapshots: Dict[Any, Any] = {}
     
     def handle_print_statement(self, line: str, line_number: int, step_number: int, 
                              steps: List[ExecutionStepSchema], create_step_func) -> bool:
         """Handle print statements with enhanced step details"""
-        print_match = re.match(r"print\((.*)\)", line)
+        print_match = _PRINT_RE.match(line)
         if not print_match:
             return False
         
         print_content = print_match.group(1).strip()
         
-        # Handle complex print statements with multiple arguments
-        if ',' in print_content and not self._is_single_string_with_commas(print_content):
-            output_parts = []
+        # A quoted string is printed as a single argument, so skip the comma scan entirely
+        if self._is_single_string_with_commas(print_content) or ',' not in print_content:
+            args = [print_content]
+            output_value = self._evaluate_print_content(print_content)
+        else:
+            # Handle complex print statements with multiple arguments
             args = self._parse_print_arguments(print_content)
-            
+            output_parts = []
             for arg in args:
                 output_parts.append(self._evaluate_print_content(arg.strip()))
             
             output_value = ' '.join(str(part) for part in output_parts)
-        else:
-            output_value = self._evaluate_print_content(print_content)
         
         # Add to print output list
         self.context["stdout"].append(output_value)
         
+        message = f"Print: {output_value}"
+        if not self.step_state:
+            steps.append(create_step_func(step_number, line_number, line, message))
+            return True
+        
         # Create step with detailed information
         state = self._create_current_state()
         state["step_detail"] = {
             "operation": "print",
             "content": print_content,
             "output": output_value,
-            "arguments": self._parse_print_arguments(print_content) if ',' in print_content else [print_content]
+            "arguments": args
         }
         
-        steps.append(create_step_func(step_number, line_number, line, f"Print: {output_value}", state))
+        steps.append(create_step_func(step_number, line_number, line, message, state=state))
         return True
     
     def _is_single_string_with_commas(self, content: str) -> bool:
-        """Check if the content is a single string that contains commas"""
-        content = content.strip()
-        return ((content.startswith('"') and content.endswith('"')) or 
-                (content.startswith("'") and content.endswith("'")))
+        """Check if the content is a single quoted string, which may contain commas"""
+        return bool(content) and content[0] in _STRING_START and content[-1] == content[0]
     
     def _parse_print_arguments(self, print_content: str) -> List[str]:
         """Parse print arguments, handling quoted strings properly"""
         args = []
-        current_arg = ""
-        in_quotes = False
-        quote_char = None
-        
-        for char in print_content:
-            if char in ['"', "'"] and not in_quotes:
-                in_quotes = True
-                quote_char = char
-                current_arg += char
-            elif char == quote_char and in_quotes:
-                in_quotes = False
-                quote_char = None
-                current_arg += char
-            elif char == ',' and not in_quotes:
-                args.append(current_arg.strip())
-                current_arg = ""
+        pos = 0
+        end = len(print_content)
+        while True:
+            # One argument: quoted strings and any other non-comma characters
+            match = _ARG_RE.match(print_content, pos)
+            arg = match.group().strip()
+            pos = match.end()
+            if pos < end:  # stopped at an unquoted comma
+                args.append(arg)
+                pos += 1
             else:
-                current_arg += char
-        
-        if current_arg.strip():
-            args.append(current_arg.strip())
-        
-        return args
+                if arg:
+                    args.append(arg)
+                return args
     
     def _evaluate_print_content(self, print_content: str) -> str:
         """Evaluate the content of a print statement"""
@@ -96,30 +168,44 @@ class PrintHandler:
             else:
                 # Try to evaluate as expression or return as-is
                 try:
-                    return str(eval(print_content, {"__builtins__": {}}, self.context["variables"]))
+                    return str(self._eval_expression(print_content))
                 except:
                     return print_content
         except Exception:
             return print_content
     
+    def _eval_expression(self, expression: str) -> Any:
+        """Evaluate an expression against the variables, compiling each distinct expression only once"""
+        entry = self._eval_cache.get(expression)
+        if entry is None:
+            try:
+                entry = (True, ast.literal_eval(expression))
+            except Exception:
+                entry = (False, compile(expression, "<print>", "eval"))
+            self._eval_cache[expression] = entry
+        
+        is_literal, payload = entry
+        if is_literal:
+            return payload
+        return eval(payload, {"__builtins__": {}}, self.context["variables"])
+    
     def _is_string_literal(self, content: str) -> bool:
         """Check if content is a string literal"""
-        return ((content.startswith('"') and content.endswith('"')) or 
-                (content.startswith("'") and content.endswith("'")))
+        return content.startswith(_STRING_START) and content.endswith(content[0])
     
     def _format_variable_value(self, var_name: str) -> str:
         """Format a variable value for printing"""
-        if var_name in self.context["variables"]:
-            value = self.context["variables"][var_name]
-            if isinstance(value, str):
-                return value
-            elif value is None:
-                return "None"
-            elif isinstance(value, bool):
-                return "True" if value else "False"
-            else:
-                return str(value)
-        return var_name
+        value = self.context["variables"].get(var_name, _MISSING)
+        if value is _MISSING:
+            return var_name
+        if isinstance(value, str):
+            return value
+        elif value is None:
+            return "None"
+        elif isinstance(value, bool):
+            return "True" if value else "False"
+        else:
+            return str(value)
     
     def _evaluate_attribute_access(self, expression: str) -> str:
         """Evaluate attribute access expressions like mylist.head, pNew.name"""
@@ -129,8 +215,9 @@ class PrintHandler:
                 obj_name, attr_name = parts
                 
                 # Check if it's an instance attribute
-                if obj_name in self.context["instances"]:
-                    return self._evaluate_instance_attribute(obj_name, attr_name)
+                instance = self.context["instances"].get(obj_name)
+                if instance is not None:
+                    return self._evaluate_instance_attribute(obj_name, attr_name, instance)
                 
                 # Check if it's a variable (node) attribute
                 elif obj_name in self.context["variables"]:
@@ -140,25 +227,11 @@ class PrintHandler:
         except Exception:
             return expression
     
-    def _evaluate_instance_attribute(self, obj_name: str, attr_name: str) -> str:
+    def _evaluate_instance_attribute(self, obj_name: str, attr_name: str, instance: Dict[str, Any]) -> str:
         """Evaluate instance attribute access"""
-        instance = self.context["instances"][obj_name]
-        
-        if attr_name == "data":
-            return str(instance.get("data", []))
-        elif attr_name == "size":
-            return str(len(instance.get("data", [])))
-        elif attr_name == "isEmpty":
-            return str(len(instance.get("data", [])) == 0)
-        elif attr_name == "is_empty":
-            return str(len(instance.get("data", [])) == 0)
-        elif attr_name == "top":
-            data = instance.get("data", [])
-            return str(data[-1] if data else None)
-        elif attr_name == "stackTop":
-            data = instance.get("data", [])
-            return str(data[-1] if data else None)
-        
+        handler = _INSTANCE_ATTR_HANDLERS.get(attr_name)
+        if handler is not None:
+            return handler(instance)
         return f"{obj_name}.{attr_name}"
     
     def _evaluate_variable_attribute(self, obj_name: str, attr_name: str) -> str:
@@ -169,46 +242,31 @@ class PrintHandler:
         """Evaluate method calls like newStack.is_empty()"""
         try:
             # Parse method call: obj.method()
-            match = re.match(r"(\w+)\.(\w+)\(\)", expression)
+            match = _METHOD_RE.match(expression)
             if match:
                 obj_name = match.group(1)
                 method_name = match.group(2)
                 
-                if obj_name in self.context["instances"]:
-                    instance = self.context["instances"][obj_name]
-                    
+                instance = self.context["instances"].get(obj_name)
+                if instance is not None:
                     # [NEW] Check logic-based behavior first
                     class_type = instance.get("class_type")
                     behavior_type = "unknown"
                     
-                    if class_type and "classes" in self.context and class_type in self.context["classes"]:
-                        methods = self.context["classes"][class_type].get("methods", {})
-                        if method_name in methods:
-                            behavior_type = methods[method_name].get("behavior_type")
-                    
-                    # Logic-based evaluation
-                    if behavior_type == "size" or method_name in ["size", "get_size", "count", "__len__"]:
-                         return str(len(instance.get("data", [])))
-                    elif behavior_type == "is_empty" or method_name in ["is_empty", "empty", "isempty"]:
-                         return str(len(instance.get("data", [])) == 0)
-                    elif behavior_type == "stackTop" or method_name in ["stackTop", "get_stack_top", "peek", "top", "get_top"]:
-                         data = instance.get("data", [])
-                         return str(data[-1] if data else None)
-                    elif behavior_type == "pop" or method_name in ["pop", "remove", "delete"]:
-                         if instance.get("data"):
-                             val = instance["data"].pop()
-                             return str(val)
-                         return "None"
+                    class_info = self.context.get("classes", {}).get(class_type) if class_type else None
+                    if class_info is not None:
+                        method_info = class_info.get("methods", {}).get(method_name)
+                        if method_info is not None:
+                            behavior_type = method_info.get("behavior_type")
                     
-                    # Fallback for explicit method names (legacy)
-                    if instance.get("class_type") == "ArrayStack":
-                        if method_name == "size":
-                            return str(len(instance.get("data", [])))
-                        elif method_name == "is_empty":
-                            return str(len(instance.get("data", [])) == 0)
-                        elif method_name == "stackTop":
-                            data = instance.get("data", [])
-                            return str(data[-1] if data else None)
+                    # Logic-based evaluation: the analyzed behavior or a known method name,
+                    # whichever category comes first in _METHOD_CATEGORY_ORDER
+                    category = _METHOD_CATEGORIES.get(method_name)
+                    behavior_rank = _METHOD_CATEGORY_ORDER.get(behavior_type)
+                    if behavior_rank is not None and (category is None or behavior_rank < _METHOD_CATEGORY_ORDER[category]):
+                        category = behavior_type
+                    if category is not None:
+                        return _METHOD_CATEGORY_HANDLERS[category](instance)
             
             return expression
         except Exception:
@@ -218,21 +276,40 @@ class PrintHandler:
         """Create current state snapshot"""
         state = {
             "instances": {},
-            "variables": self.context["variables"].copy(),
-            "variables": self.context["variables"].copy(),
-            "stdout": self.context.get("stdout", []).copy(),
+            "variables": self._snapshot("variables", self.context["variables"]),
+            # stdout only ever grows, so an immutable tuple is a safe snapshot
+            "stdout": tuple(self.context.get("stdout", ())),
             "active": self.context.get("active_instance")
         }
         
         # Add detailed instance states
+        instance_states = state["instances"]
         for name, instance in self.context["instances"].items():
             if instance.get("class_type") == "ArrayStack":
-                state["instances"][name] = {
+                data = instance["data"]
+                size = len(data)
+                instance_states[name] = {
                     "type": "ArrayStack",
-                    "data": instance["data"].copy(),
-                    "size": len(instance["data"]),
-                    "isEmpty": len(instance["data"]) == 0,
-                    "top": instance["data"][-1] if instance["data"] else None
+                    "data": self._snapshot(("stack", name), data),
+                    "size": size,
+                    "isEmpty": size == 0,
+                    "top": data[-1] if size else None
                 }
         
-        return state
\ No newline at end of file
+        return state
+    
+    def _snapshot(self, key: Any, container: Any) -> Any:
+        """Return a shallow copy of container, reusing the previous copy while it holds the same objects"""
+        previous = self._snapshots.get(key)
+        # Compare by identity: 1, 1.0 and True are equal but must not share a snapshot
+        if previous is not None and len(previous) == len(container):
+            if isinstance(container, dict):
+                unchanged = all(old_name == name and old is value for (old_name, old), (name, value)
+                                in zip(previous.items(), container.items()))
+            else:
+                unchanged = all(old is value for old, value in zip(previous, container))
+            if unchanged:
+                return previous
+        snapshot = container.copy()
+        self._snapshots[key] = snapshot
+        return snapshot
\ No newline at end of file
@@ -4,6 +4,38 @@ from app.schemas.playground import ExecutionStepSchema
 from app.services.simulators.operations.node_manager import NodeManager
 from app.services.simulators.operations.print_handler import PrintHandler
 
+# One pattern for every assignment form; the outer group name tells which one matched.
+# prev_head comes before attribute because "pNew.prev = mylist.head" also starts like an attribute assignment.
+_ASSIGNMENT_RE = re.compile(
+    r"(?P<instantiation>(?P<inst_var>\w+)\s*=\s*(?P<inst_class>\w+)\(\))"
+    r"|(?P<node_creation>(?P<node_var>\w+)\s*=\s*DataNode\([\"'](?P<node_name>[^\"']*)[\"']\))"
+    r"|(?P<head_next>(?P<hn_instance>\w+)\.head\.next\s*=\s*(?P<hn_value>\w+))"
+    r"|(?P<prev_head>(?P<ph_node>\w+)\.prev\s*=\s*(?P<ph_instance>\w+)\.head)"
+    r"|(?P<attribute>(?P<attr_instance>\w+)\.(?P<attr_name>\w+)\s*=\s*(?P<attr_value>\w+))"
+)
+_METHOD_CALL_RE = re.compile(r"(\w+)\.(\w+)\((.*?)\)")
+
+
+def _is_word(text: str) -> bool:
+    """Check that text is a plain ASCII identifier, a subset of what \\w+ matches"""
+    return text.isascii() and text.isidentifier()
+
+
+def _split_method_call(line: str):
+    """Split obj.method(params) into its parts, same as _METHOD_CALL_RE but without the regex engine"""
+    dot = line.find(".")
+    lparen = line.find("(", dot + 1)
+    rparen = line.find(")", lparen + 1)
+    if dot > 0 and lparen > 0 and rparen > 0:
+        instance_name = line[:dot]
+        method_name = line[dot + 1:lparen]
+        if _is_word(instance_name) and _is_word(method_name):
+            return instance_name, method_name, line[lparen + 1:rparen]
+    
+    # Digits-first or non-ASCII names and malformed lines go through the regex
+    match = _METHOD_CALL_RE.match(line)
+    return match.groups() if match else None
+
 
 class OperationParser:
     """Handles parsing and execution of individual operations"""
@@ -12,52 +44,63 @@ class OperationParser:
         self.context = context
         self.node_manager = NodeManager(context)
         self.print_handler = PrintHandler(context)
+        # id(instance) -> (instance, link version, display list) from the last traversal
+        self._traverse_cache: Dict[int, tuple] = {}
     
     def parse_and_execute(self, line: str, line_number: int, step_number: int, 
                          steps: List[ExecutionStepSchema], 
                          create_step_func) -> bool:
         """Parse and execute a single operation. Returns True if handled."""
+        # Every pattern below needs at least one of these characters, so check them once
+        has_eq = "=" in line
+        has_dot = "." in line
+        has_paren = "(" in line
         
-        # Handle print statements first
-        if self.print_handler.handle_print_statement(line, line_number, step_number, steps, create_step_func):
-            return True
-        
-        # Class instantiation
-        if self._handle_class_instantiation(line, line_number, step_number, steps, create_step_func):
-            return True
-        
-        # Node creation with parameter
-        if self._handle_node_creation(line, line_number, step_number, steps, create_step_func):
-            return True
-        
-        # Direct attribute assignment
-        if self._handle_attribute_assignment(line, line_number, step_number, steps, create_step_func):
+        # Handle print statements first; the print pattern is anchored, so the prefix decides
+        if line.startswith("print(") and self.print_handler.handle_print_statement(line, line_number, step_number, steps, create_step_func):
             return True
         
-        # Chained attribute assignment
-        if self._handle_chained_assignment(line, line_number, step_number, steps, create_step_func):
-            return True
+        # Class instantiation, node creation and attribute assignments
+        if has_eq:
+            match = _ASSIGNMENT_RE.match(line)
+            if match and self._handle_assignment(match, line, line_number, step_number, steps, create_step_func):
+                return True
         
         # Method calls
-        if self._handle_method_calls(line, line_number, step_number, steps, create_step_func):
+        if has_dot and has_paren and self._handle_method_calls(line, line_number, step_number, steps, create_step_func):
             return True
         
         # Legacy operations
-        if self._handle_legacy_operations(line, line_number, step_number, steps, create_step_func):
+        if has_eq and self._handle_legacy_operations(line, line_number, step_number, steps, create_step_func):
             return True
         
         return False
     
-    def _handle_class_instantiation(self, line: str, line_number: int, step_number: int, 
+    def _handle_assignment(self, match: re.Match, line: str, line_number: int, step_number: int, 
+                          steps: List[ExecutionStepSchema], create_step_func) -> bool:
+        """Dispatch a line matched by _ASSIGNMENT_RE to the handler for its form"""
+        kind = match.lastgroup
+        if kind == "instantiation":
+            return self._handle_class_instantiation(match["inst_var"], match["inst_class"], line, line_number, 
+                                                    step_number, steps, create_step_func)
+        if kind == "node_creation":
+            return self._handle_node_creation(match["node_var"], match["node_name"], line, line_number, 
+                                              step_number, steps, create_step_func)
+        if kind == "head_next":
+            return self._handle_head_next_assignment(match["hn_instance"], match["hn_value"], line, line_number, 
+                                                     step_number, steps, create_step_func)
+        if kind == "prev_head":
+            # Read as a plain attribute assignment first, as "pNew.prev = mylist" would be
+            return (self._handle_attribute_assignment(match["ph_node"], "prev", match["ph_instance"], line, line_number, 
+                                                      step_number, steps, create_step_func)
+                    or self._handle_prev_head_assignment(match["ph_node"], match["ph_instance"], line, line_number, 
+                                                         step_number, steps, create_step_func))
+        return self._handle_attribute_assignment(match["attr_instance"], match["attr_name"], match["attr_value"], line, 
+                                                 line_number, step_number, steps, create_step_func)
+    
+    def _handle_class_instantiation(self, var_name: str, class_name: str, line: str, line_number: int, step_number: int, 
                                    steps: List[ExecutionStepSchema], create_step_func) -> bool:
         """Handle class instantiation: var = ClassName()"""
-        match = re.match(r"(\w+)\s*=\s*(\w+)\(\)", line)
-        if not match:
-            return False
-        
-        var_name = match.group(1)
-        class_name = match.group(2)
-        
         if class_name not in self.context["classes"]:
             return False
         
@@ -69,31 +112,17 @@ class OperationParser:
             steps.append(create_step_func(step_number, line_number, line, error=str(e)))
             raise e
     
-    def _handle_node_creation(self, line: str, line_number: int, step_number: int, 
+    def _handle_node_creation(self, var_name: str, node_name: str, line: str, line_number: int, step_number: int, 
                              steps: List[ExecutionStepSchema], create_step_func) -> bool:
         """Handle node creation: pNew = DataNode("John")"""
-        match = re.match(r"(\w+)\s*=\s*DataNode\([\"']([^\"']*)[\"']\)", line)
-        if not match:
-            return False
-        
-        var_name = match.group(1)
-        node_name = match.group(2)
-        
         message = self.node_manager.create_node(var_name, node_name)
         steps.append(create_step_func(step_number, line_number, line, message))
         return True
     
-    def _handle_attribute_assignment(self, line: str, line_number: int, step_number: int, 
+    def _handle_attribute_assignment(self, instance_name: str, attribute: str, value_var: str, line: str, 
+                                   line_number: int, step_number: int, 
                                    steps: List[ExecutionStepSchema], create_step_func) -> bool:
         """Handle direct attribute assignment: mylist.head = pNew"""
-        match = re.match(r"(\w+)\.(\w+)\s*=\s*(\w+)", line)
-        if not match:
-            return False
-        
-        instance_name = match.group(1)
-        attribute = match.group(2)
-        value_var = match.group(3)
-        
         if instance_name not in self.context["instances"] or value_var not in self.context["variables"]:
             return False
         
@@ -101,54 +130,42 @@ class OperationParser:
         steps.append(create_step_func(step_number, line_number, line, message))
         return True
     
-    def _handle_chained_assignment(self, line: str, line_number: int, step_number: int, 
-                                 steps: List[ExecutionStepSchema], create_step_func) -> bool:
-        """Handle chained attribute assignment: mylist.head.next = pNew or pNew.prev = mylist.head"""
-        
-        # Handle mylist.head.next = pNew
-        match = re.match(r"(\w+)\.head\.next\s*=\s*(\w+)", line)
-        if match:
-            instance_name = match.group(1)
-            value_var = match.group(2)
-            
-            if instance_name not in self.context["instances"] or value_var not in self.context["variables"]:
-                return False
-            
-            message = self.node_manager.set_chained_attribute(instance_name, value_var)
-            steps.append(create_step_func(step_number, line_number, line, message))
-            return True
+    def _handle_head_next_assignment(self, instance_name: str, value_var: str, line: str, line_number: int, 
+                                     step_number: int, steps: List[ExecutionStepSchema], create_step_func) -> bool:
+        """Handle chained attribute assignment: mylist.head.next = pNew"""
+        if instance_name not in self.context["instances"] or value_var not in self.context["variables"]:
+            return False
         
-        # Handle pNew.prev = mylist.head (for doubly linked list)
-        match = re.match(r"(\w+)\.prev\s*=\s*(\w+)\.head", line)
-        if match:
-            node_var = match.group(1)
-            instance_name = match.group(2)
-            
-            if instance_name not in self.context["instances"] or node_var not in self.context["variables"]:
-                return False
-            
-            message = self.node_manager.set_prev_attribute(node_var, instance_name)
-            steps.append(create_step_func(step_number, line_number, line, message))
-            return True
+        message = self.node_manager.set_chained_attribute(instance_name, value_var)
+        steps.append(create_step_func(step_number, line_number, line, message))
+        return True
+    
+    def _handle_prev_head_assignment(self, node_var: str, instance_name: str, line: str, line_number: int, 
+                                     step_number: int, steps: List[ExecutionStepSchema], create_step_func) -> bool:
+        """Handle pNew.prev = mylist.head (for doubly linked list)"""
+        if instance_name not in self.context["instances"] or node_var not in self.context["variables"]:
+            return False
         
-        return False
+        message = self.node_manager.set_prev_attribute(node_var, instance_name)
+        steps.append(create_step_func(step_number, line_number, line, message))
+        return True
     
     def _handle_method_calls(self, line: str, line_number: int, step_number: int, 
                            steps: List[ExecutionStepSchema], create_step_func) -> bool:
         """Handle method calls: mylist.traverse(), mylist.insertFront("data"), etc."""
-        method_match = re.match(r"(\w+)\.(\w+)\((.*?)\)", line)
-        if not method_match:
+        method_call = _split_method_call(line)
+        if method_call is None:
             return False
         
-        instance_name = method_match.group(1)
-        method_name = method_match.group(2)
-        params = method_match.group(3).strip()
+        instance_name, method_name, params = method_call
+        params = params.strip()
         
-        if instance_name not in self.context["instances"]:
+        context = self.context
+        instance = context["instances"].get(instance_name)
+        if instance is None:
             raise ValueError(f"Instance '{instance_name}' not found")
         
-        instance = self.context["instances"][instance_name]
-        self.context["active_instance"] = instance_name
+        context["active_instance"] = instance_name
         
         message = self._execute_method(instance, instance_name, method_name, params)
         steps.append(create_step_func(step_number, line_number, line, message))
@@ -185,9 +202,10 @@ class OperationParser:
             return "insertLast requires data parameter"
         
         elif method_name == "insertBefore":
-            param_parts = [p.strip().strip('"\'') for p in params.split(',')]
-            if len(param_parts) == 2:
-                target_name, new_data = param_parts
+            target_part, sep, data_part = params.partition(',')
+            if sep and ',' not in data_part:
+                target_name = target_part.strip().strip('"\'')
+                new_data = data_part.strip().strip('"\'')
                 message = self.node_manager.insert_before(instance, target_name, new_data)
                 return f"{message} in {instance_name}"
             return "insertBefore requires target and data parameters"
@@ -230,20 +248,45 @@ class OperationParser:
     
     def _traverse_linked_list(self, instance: Dict[str, Any]) -> List[str]:
         """Traverse a linked list instance and return display data"""
+        version = self.context.get("_link_version")
+        cached = self._traverse_cache.get(id(instance))
+        if cached is not None and cached[0] is instance and cached[1] == version:
+            return cached[2]
+        
+        nodes = self.context["nodes"]
         result = []
-        if instance.get("head") is None:
-            return []
+        append = result.append
+        current_node_id = instance.get("head")
+        
+        # An acyclic list cannot be longer than the node table, so only a cycle exhausts the budget
+        remaining = len(nodes)
+        while current_node_id is not None and remaining:
+            remaining -= 1
+            node = nodes.get(current_node_id)
+            if node is None:
+                break
+            append(node["name"])
+            current_node_id = node["next"]
         
-        current_node_id = instance["head"]
+        if current_node_id is not None and not remaining:
+            result = self._traverse_with_cycle_check(instance)
+        
+        self._traverse_cache[id(instance)] = (instance, version, result)
+        return result
+    
+    def _traverse_with_cycle_check(self, instance: Dict[str, Any]) -> List[str]:
+        """Traverse a linked list that may contain a cycle, stopping at the first revisited node"""
+        nodes = self.context["nodes"]
+        result = []
         visited = set()  # Prevent infinite loops
+        current_node_id = instance.get("head")
         
         while current_node_id is not None and current_node_id not in visited:
             visited.add(current_node_id)
-            if current_node_id in self.context["nodes"]:
-                node = self.context["nodes"][current_node_id]
-                result.append(node["name"])
-                current_node_id = node["next"]
-            else:
+            node = nodes.get(current_node_id)
+            if node is None:
                 break
-                
+            result.append(node["name"])
+            current_node_id = node["next"]
+        
         return result
\ No newline at end of file
@@ -6,32 +6,32 @@ class QueueFunctionHandler:
     
     def __init__(self, context: Dict[str, Any]):
         self.context = context
+        self._function_map = {
+            "reverse_queue": self._handle_reverse_queue,
+        }
     
     def simulate_function_call(self, func_name: str, args: str) -> Any:
         """Simulate function calls"""
-        function_map = {
-            "reverse_queue": self._handle_reverse_queue,
-        }
-        
-        if func_name in function_map:
-            return function_map[func_name](args)
+        handler = self._function_map.get(func_name)
+        if handler is not None:
+            return handler(args)
         
         return None
     
     def _handle_reverse_queue(self, args: str) -> Any:
         """Handle reverse queue function"""
-        arg_parts = [arg.strip() for arg in args.split(',')]
-        if len(arg_parts) == 1:
-            queue_name = arg_parts[0]
+        if ',' not in args:
+            queue_name = args.strip()
             if queue_name in self.context["instances"]:
                 queue = self.context["instances"][queue_name]
-                original_data = queue["data"].copy()
-                queue["data"] = list(reversed(queue["data"]))
+                original_data = list(queue["data"])
+                queue["data"].reverse()
+                queue["_mutations"] = queue.get("_mutations", 0) + 1
                 return {
                     "operation": "reverse_queue",
                     "queue_name": queue_name,
                     "before": original_data,
-                    "after": queue["data"].copy()
+                    "after": original_data[::-1]
                 }
         return None
 
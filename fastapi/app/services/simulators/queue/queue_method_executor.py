@@ -1,5 +1,9 @@
+import sys
 from typing import Dict, Any
-from app.services.simulators.queue.queue_node_manager import QueueNodeManager
+from app.services.simulators.queue.queue_node_manager import ARRAY_QUEUE, QueueNodeManager
+
+# Longer digit strings can exceed the interpreter's int() digit limit (never set below 640)
+_MAX_FAST_DIGITS = 640
 
 
 class QueueMethodExecutor:
@@ -8,38 +12,20 @@ class QueueMethodExecutor:
     def __init__(self, context: Dict[str, Any]):
         self.context = context
         self.node_manager = QueueNodeManager(context)
-    
-    def execute_method(self, instance: Dict[str, Any], instance_name: str, 
-                      method_name: str, params: str) -> Dict[str, Any]:
-        """Execute ArrayQueue methods with enhanced tracking"""
-        if instance.get("class_type") != "ArrayQueue":
-            return {"message": f"Unknown method {method_name}", "operation": method_name}
         
-        # Check available behaviors from context first
-        if "classes" in self.context and isinstance(self.context["classes"], dict):
-            # Find the class and its method behaviors
-            class_type = instance.get("class_type")
-            if class_type and class_type in self.context["classes"]:
-                 methods = self.context["classes"][class_type].get("methods", {})
-                 if isinstance(methods, dict) and method_name in methods:
-                     method_info = methods[method_name]
-                     behavior_type = method_info.get("behavior_type")
-                     
-                     # Map behavior types to handlers
-                     behavior_map = {
-                         "enqueue": self._handle_enqueue,
-                         "dequeue": self._handle_dequeue,
-                         "size": self._handle_size,
-                         "is_empty": self._handle_is_empty,
-                         "front": self._handle_front,
-                         "back": self._handle_back,
-                         "printQueue": self._handle_print_queue
-                     }
-                     
-                     if behavior_type in behavior_map:
-                         return behavior_map[behavior_type](instance, instance_name, params)
-
-        method_map = {
+        # Analyzed behavior type -> handler
+        self._behavior_map = {
+            "enqueue": self._handle_enqueue,
+            "dequeue": self._handle_dequeue,
+            "size": self._handle_size,
+            "is_empty": self._handle_is_empty,
+            "front": self._handle_front,
+            "back": self._handle_back,
+            "printQueue": self._handle_print_queue
+        }
+        
+        # Well-known method name -> handler
+        self._method_map = {
             "enqueue": self._handle_enqueue,
             "add": self._handle_enqueue,
             "push": self._handle_enqueue,
@@ -74,9 +60,32 @@ class QueueMethodExecutor:
             "display": self._handle_print_queue, 
             "show": self._handle_print_queue
         }
+    
+    def execute_method(self, instance: Dict[str, Any], instance_name: str, 
+                      method_name: str, params: str) -> Dict[str, Any]:
+        """Execute ArrayQueue methods with enhanced tracking"""
+        # Table keys are interned literals, so an interned name matches them by identity
+        method_name = sys.intern(method_name)
+        if instance.get("class_type") != ARRAY_QUEUE:
+            return {"message": f"Unknown method {method_name}", "operation": method_name}
         
-        if method_name in method_map:
-            return method_map[method_name](instance, instance_name, params)
+        # Check available behaviors from context first
+        if "classes" in self.context and isinstance(self.context["classes"], dict):
+            # Find the class and its method behaviors
+            class_type = instance.get("class_type")
+            if class_type and class_type in self.context["classes"]:
+                 methods = self.context["classes"][class_type].get("methods", {})
+                 if isinstance(methods, dict) and method_name in methods:
+                     method_info = methods[method_name]
+                     behavior_type = method_info.get("behavior_type")
+                     
+                     handler = self._behavior_map.get(behavior_type)
+                     if handler is not None:
+                         return handler(instance, instance_name, params)
+
+        handler = self._method_map.get(method_name)
+        if handler is not None:
+            return handler(instance, instance_name, params)
         else:
             return {
                 "message": f"Unknown method {method_name}", 
@@ -128,14 +137,22 @@ class QueueMethodExecutor:
            (params.startswith("'") and params.endswith("'")):
             return params[1:-1]
         
-        # Number
-        try:
-            if '.' in params:
-                return float(params)
-            else:
-                return int(params)
-        except ValueError:
-            pass
+        # Number: plain integers and decimals are recognized without raising
+        digits = params[1:] if params[:1] in ("+", "-") else params
+        if digits.isdecimal() and len(digits) <= _MAX_FAST_DIGITS:
+            return int(params)
+        whole, dot, fraction = digits.partition('.')
+        if dot and (whole or fraction) and (not whole or whole.isdecimal()) and (not fraction or fraction.isdecimal()):
+            return float(params)
+        if digits[:1].isdecimal() or digits[:1] == '.':
+            # Rarer numeric forms such as 1_000 or 1.5e3
+            try:
+                if '.' in params:
+                    return float(params)
+                else:
+                    return int(params)
+            except ValueError:
+                pass
         
         # Variable reference
         if params in self.context["variables"]:
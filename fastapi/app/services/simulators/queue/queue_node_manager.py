@@ -1,54 +1,82 @@
+from collections import deque
 from typing import Dict, Any
 from app.services.simulators.operations.node_manager import NodeManager
 from app.utils.messages_th import get_message
 
+# class_type tag of ArrayQueue instances; compare against this one interned object
+ARRAY_QUEUE = "ArrayQueue"
+
+# Messages for failed operations never change, so build them once
+_ENQUEUE_OVERFLOW_SUFFIX = " - Queue is full (overflow)"
+_EMPTY_SUFFIX = " - " + get_message("traverse_empty")
+_DEQUEUE_EMPTY_MESSAGE = "ลบข้อมูลออกจาก queue ที่ตำแหน่งหน้า" + _EMPTY_SUFFIX
+_FRONT_EMPTY_MESSAGE = "ดูข้อมูลที่ตำแหน่งหน้าของ queue โดยไม่ลบออก" + _EMPTY_SUFFIX
+_BACK_EMPTY_MESSAGE = "ดูข้อมูลที่ตำแหน่งท้ายของ queue โดยไม่ลบออก" + _EMPTY_SUFFIX
+
 
 class QueueNodeManager(NodeManager):
     """Enhanced Queue-specific node manager for ArrayQueue operations"""
     
     def create_instance_data(self, class_name: str) -> Dict[str, Any]:
         """Create new instance data structure for ArrayQueue"""
-        if class_name == "ArrayQueue":
+        if class_name == ARRAY_QUEUE:
             return {
-                "data": [],
-                "class_type": class_name,
+                "data": deque(),  # O(1) dequeue from the front
+                # The shared tag rather than the parsed name, so class_type checks succeed on identity
+                "class_type": ARRAY_QUEUE,
                 "attributes": {},
-                "history": []  # Track operation history
+                "history": [],  # Track operation history
+                "_mutations": 0  # Bumped on every change to data, lets snapshots be reused
             }
         return super().create_instance_data(class_name)
     
     def create_instance(self, var_name: str, class_name: str) -> str:
         """Create a new instance of a class"""
-        if class_name == "ArrayQueue":
+        if class_name == ARRAY_QUEUE:
             self.context["instances"][var_name] = self.create_instance_data(class_name)
             self.context["active_instance"] = var_name
             return get_message("instance_created_generic", class_name=class_name, var_name=var_name)
         else:
             return super().create_instance(var_name, class_name)
     
+    def _queue_changed(self, instance: Dict[str, Any]) -> None:
+        """Mark the queue data as changed so cached snapshots are rebuilt"""
+        instance["_mutations"] = instance.get("_mutations", 0) + 1
+    
     def queue_enqueue(self, instance: Dict[str, Any], value: Any, instance_name: str = "") -> Dict[str, Any]:
         """Enqueue value to queue with detailed tracking"""
         # Check for overflow if max_size is defined
         max_size = instance.get("attributes", {}).get("max_size")
         if max_size is not None and len(instance["data"]) >= max_size:
             return {
-                "message": f"เพิ่มข้อมูล '{value}' ลงใน queue" + " - Queue is full (overflow)",
+                "message": f"เพิ่มข้อมูล '{value}' ลงใน queue{_ENQUEUE_OVERFLOW_SUFFIX}",
                 "operation": "enqueue",
                 "value": value,
                 "error": "overflow",
                 "instance_name": instance_name
             }
         
-        old_data = instance["data"].copy()
+        # Without history, skip the before/after snapshots entirely
+        if not self.context.get("record_history", True):
+            instance["data"].append(value)
+            self._queue_changed(instance)
+            return {
+                "message": f"เพิ่มข้อมูล '{value}' ลงใน queue (FIFO - First In First Out)",
+                "operation": "enqueue",
+                "value": value,
+                "instance_name": instance_name
+            }
+        
+        old_data = list(instance["data"])
         instance["data"].append(value)
-        new_data = instance["data"].copy()
+        self._queue_changed(instance)
+        new_data = list(instance["data"])
         
-        # Record operation in history
+        # Record operation in history as a diff; the full arrays only go out in the response
         instance["history"].append({
             "operation": "enqueue",
             "value": value,
-            "before": old_data,
-            "after": new_data
+            "index": len(old_data)
         })
         
         return {
@@ -64,23 +92,33 @@ class QueueNodeManager(NodeManager):
         """Dequeue value from queue with detailed tracking"""
         if not instance["data"]:
             return {
-                "message": "ลบข้อมูลออกจาก queue ที่ตำแหน่งหน้า" + " - " + get_message("traverse_empty"),
+                "message": _DEQUEUE_EMPTY_MESSAGE,
                 "operation": "dequeue",
                 "value": None,
                 "error": "underflow",
                 "instance_name": instance_name
             }
         
-        old_data = instance["data"].copy()
-        value = instance["data"].pop(0)  # FIFO - remove from front
-        new_data = instance["data"].copy()
+        if not self.context.get("record_history", True):
+            value = instance["data"].popleft()  # FIFO - remove from front
+            self._queue_changed(instance)
+            return {
+                "message": f"ลบข้อมูลออกจาก queue ที่ตำแหน่งหน้า → คืนค่า {value}",
+                "operation": "dequeue",
+                "value": value,
+                "instance_name": instance_name
+            }
         
-        # Record operation in history
+        old_data = list(instance["data"])
+        value = instance["data"].popleft()  # FIFO - remove from front
+        self._queue_changed(instance)
+        new_data = list(instance["data"])
+        
+        # Record operation in history as a diff; the full arrays only go out in the response
         instance["history"].append({
             "operation": "dequeue",
             "value": value,
-            "before": old_data,
-            "after": new_data
+            "index": 0
         })
         
         return {
@@ -92,11 +130,59 @@ class QueueNodeManager(NodeManager):
             "instance_name": instance_name
         }
     
+    def queue_replay_batch(self, instance: Dict[str, Any], ops, values, instance_name: str = "") -> Dict[str, Any]:
+        """Apply parallel sequences of enqueue/dequeue operations in one pass, e.g. to replay a session"""
+        data = instance["data"]
+        max_size = instance.get("attributes", {}).get("max_size")
+        # Without history, skip the history entries and the before/after snapshots
+        record_history = self.context.get("record_history", True)
+        old_data = list(data) if record_history else None
+        
+        # Bind the hot methods once; the loop below runs per operation
+        append, popleft, record = data.append, data.popleft, instance["history"].append
+        dequeued = []
+        errors = []
+        enqueued = 0
+        for op, value in zip(ops, values):
+            if op == "enqueue":
+                if max_size is not None and len(data) >= max_size:
+                    errors.append("overflow")
+                    continue
+                if record_history:
+                    record({"operation": "enqueue", "value": value, "index": len(data)})
+                append(value)
+                enqueued += 1
+            elif op == "dequeue":
+                if not data:
+                    errors.append("underflow")
+                    continue
+                value = popleft()
+                if record_history:
+                    record({"operation": "dequeue", "value": value, "index": 0})
+                dequeued.append(value)
+            else:
+                errors.append("unknown_operation")
+        self._queue_changed(instance)
+        
+        result = {
+            "message": f"เพิ่มข้อมูล {enqueued} ตัวและลบข้อมูล {len(dequeued)} ตัวออกจาก queue",
+            "operation": "replay_batch",
+            "value": dequeued,
+            "instance_name": instance_name
+        }
+        if record_history:
+            result["before_data"] = old_data
+            result["after_data"] = list(data)
+        if errors:
+            result["error"] = errors[0]
+            result["skipped"] = len(errors)
+        return result
+    
     def queue_front(self, instance: Dict[str, Any], instance_name: str = "") -> Dict[str, Any]:
         """Get front value of queue"""
         if not instance["data"]:
             return {
-                "message": "ดูข้อมูลที่ตำแหน่งหน้าของ queue โดยไม่ลบออก" + " - " + get_message("traverse_empty"),
+                "message": _FRONT_EMPTY_MESSAGE,
                 "operation": "front",
                 "value": None,
                 "error": "empty_queue",
@@ -115,7 +201,7 @@ class QueueNodeManager(NodeManager):
         """Get back value of queue"""
         if not instance["data"]:
             return {
-                "message": "ดูข้อมูลที่ตำแหน่งท้ายของ queue โดยไม่ลบออก" + " - " + get_message("traverse_empty"),
+                "message": _BACK_EMPTY_MESSAGE,
                 "operation": "back",
                 "value": None,
                 "error": "empty_queue",
@@ -152,11 +238,12 @@ class QueueNodeManager(NodeManager):
     
     def queue_print(self, instance: Dict[str, Any], instance_name: str = "") -> Dict[str, Any]:
         """Print queue contents"""
-        queue_data = instance["data"].copy()
+        # One list snapshot serves as both the printed text and the step value
+        queue_data = list(instance["data"])
         print_output = str(queue_data)
         self.context["stdout"].append(print_output)
         return {
-            "message": f"แสดงข้อมูล {instance_name}: {queue_data}",
+            "message": f"แสดงข้อมูล {instance_name}: {print_output}",
             "operation": "printQueue",
             "value": queue_data,
             "instance_name": instance_name,
@@ -3,7 +3,30 @@ from typing import List, Dict, Any
 from app.schemas.playground import ExecutionStepSchema
 from app.services.simulators.queue.queue_method_executor import QueueMethodExecutor
 from app.services.simulators.queue.queue_function_handler import QueueFunctionHandler
-from app.services.simulators.queue.queue_node_manager import QueueNodeManager
+from app.services.simulators.queue.queue_node_manager import ARRAY_QUEUE, QueueNodeManager
+
+_INSTANTIATION_RE = re.compile(r"(\w+)\s*=\s*(\w+)\s*\(\s*\)")
+_METHOD_CALL_RE = re.compile(r"(\w+)\.(\w+)\s*\((.*?)\)")
+_ASSIGNMENT_FROM_METHOD_RE = re.compile(r"(\w+)\s*=\s*(\w+)\.(\w+)\s*\((.*?)\)")
+_ASSIGNMENT_FUNC_RE = re.compile(r"(\w+)\s*=\s*(\w+)\((.*?)\)")
+_DIRECT_FUNC_RE = re.compile(r"(\w+)\((.*?)\)")
+# Every statement form starts with a word followed by '=', '.' or '(', which decides the candidate handlers
+_STATEMENT_HEAD_RE = re.compile(r"\w+(?:(?P<assignment>\s*=)|(?P<attribute>\.)|(?P<call>\())")
+
+
+def _parse_simple_assignment(line: str):
+    """Split 'name = value' into (name, value) without a regex, or return None"""
+    name, sep, value = line.partition('=')
+    if not sep:
+        return None
+    name = name.rstrip()
+    # A '_' prefix makes isidentifier() accept the word characters of names like '1a' too
+    if not name or not ('_' + name).isidentifier():
+        return None
+    value = value.strip()
+    if not value:
+        return None
+    return name, value
 
 
 class QueueStatementParser:
@@ -15,46 +38,62 @@ class QueueStatementParser:
         self.method_executor = QueueMethodExecutor(context)
         self.function_handler = QueueFunctionHandler(context)
         self.node_manager = QueueNodeManager(context)
+        # Methods whose result can be assigned to a variable, e.g. x = q.dequeue()
+        self._assignable_methods = {
+            "dequeue": self.node_manager.queue_dequeue,
+            "front": self.node_manager.queue_front,
+            "back": self.node_manager.queue_back,
+        }
+        # Last snapshot taken per container, shared by consecutive steps while unchanged
+        self._snapshots: Dict[Any, Any] = {}
     
     def execute_single_statement(self, line: str, line_number: int, step_number: int, 
                                  steps: List[ExecutionStepSchema], create_step_func) -> bool:
         """Execute a single statement with detailed tracking"""
+        head = _STATEMENT_HEAD_RE.match(line)
+        if head is None:
+            return False
+        kind = head.lastgroup
         
-        # Handle class instantiation
-        if self._handle_class_instantiation(line, line_number, step_number, steps, create_step_func):
-            return True
-        
-        # Handle method calls
-        if self._handle_method_calls(line, line_number, step_number, steps, create_step_func):
-            return True
-        
-        # Handle variable assignments from method calls
-        if self._handle_assignment_from_method(line, line_number, step_number, steps, create_step_func):
-            return True
+        if kind == "assignment":
+            # The first '(' and '.' decide which assignment form the line can be
+            paren = line.find('(')
+            if paren < 0:
+                # Handle simple variable assignments
+                return self._handle_simple_assignment(line, line_number, step_number, steps, create_step_func)
+            
+            dot = line.find('.', 0, paren)
+            if dot >= 0:
+                # Handle variable assignments from method calls
+                return self._handle_assignment_from_method(line, line_number, step_number, steps, create_step_func)
+            
+            # Handle class instantiation
+            if self._handle_class_instantiation(line, line_number, step_number, steps, create_step_func):
+                return True
+            
+            # Handle function calls with assignment
+            return self._handle_function_calls(line, line_number, step_number, steps, create_step_func)
         
-        # Handle simple variable assignments
-        if self._handle_simple_assignment(line, line_number, step_number, steps, create_step_func):
-            return True
+        if kind == "attribute":
+            # Handle method calls
+            return self._handle_method_calls(line, line_number, step_number, steps, create_step_func)
         
         # Handle function calls
         if self._handle_function_calls(line, line_number, step_number, steps, create_step_func):
             return True
         
         # Handle print statements
-        if self.print_handler.handle_print_statement(line, line_number, step_number, steps, create_step_func):
-            return True
-        
-        return False
+        return self.print_handler.handle_print_statement(line, line_number, step_number, steps, create_step_func)
     
     def _handle_class_instantiation(self, line: str, line_number: int, step_number: int, 
                                    steps: List[ExecutionStepSchema], create_step_func) -> bool:
         """Handle class instantiation with better parsing"""
-        instantiation_match = re.match(r"(\w+)\s*=\s*(\w+)\s*\(\s*\)", line)
+        instantiation_match = _INSTANTIATION_RE.match(line)
         if instantiation_match:
             var_name = instantiation_match.group(1)
             class_name = instantiation_match.group(2)
             
-            if class_name == "ArrayQueue":
+            if class_name == ARRAY_QUEUE:
                 message = self.node_manager.create_instance(var_name, class_name)
                 state = self._create_current_state()
                 state["step_detail"] = {
@@ -70,7 +109,7 @@ class QueueStatementParser:
     def _handle_method_calls(self, line: str, line_number: int, step_number: int, 
                             steps: List[ExecutionStepSchema], create_step_func) -> bool:
         """Handle method calls with instance tracking"""
-        method_match = re.match(r"(\w+)\.(\w+)\s*\((.*?)\)", line)
+        method_match = _METHOD_CALL_RE.match(line)
         if method_match:
             instance_name = method_match.group(1)
             method_name = method_match.group(2)
@@ -79,8 +118,6 @@ class QueueStatementParser:
             if instance_name in self.context["instances"]:
                 instance = self.context["instances"][instance_name]
                 result = self.method_executor.execute_method(instance, instance_name, method_name, params)
-                state = self._create_current_state()
-                state["step_detail"] = result
                 
                 # Special handling for printQueue method to show print output
                 if method_name == "printQueue" and "stdout" in result:
@@ -94,6 +131,9 @@ class QueueStatementParser:
                     }
                     steps.append(create_step_func(step_number, line_number, line, f"Print: {result['stdout']}", print_state))
                 else:
+                    # Only the step that is emitted gets a snapshot
+                    state = self._create_current_state()
+                    state["step_detail"] = result
                     steps.append(create_step_func(step_number, line_number, line, result["message"], state))
                 return True
         return False
@@ -101,7 +141,7 @@ class QueueStatementParser:
     def _handle_assignment_from_method(self, line: str, line_number: int, step_number: int, 
                                       steps: List[ExecutionStepSchema], create_step_func) -> bool:
         """Handle variable assignments from method calls"""
-        assignment_match = re.match(r"(\w+)\s*=\s*(\w+)\.(\w+)\s*\((.*?)\)", line)
+        assignment_match = _ASSIGNMENT_FROM_METHOD_RE.match(line)
         if assignment_match:
             var_name = assignment_match.group(1)
             instance_name = assignment_match.group(2)
@@ -111,37 +151,12 @@ class QueueStatementParser:
             if instance_name in self.context["instances"]:
                 instance = self.context["instances"][instance_name]
                 
-                if method_name == "dequeue" and instance.get("class_type") == "ArrayQueue":
-                    result = self.node_manager.queue_dequeue(instance, instance_name)
-                    if result.get("value") is not None:
-                        self.context["variables"][var_name] = result["value"]
-                        result["message"] = f"Assigned {var_name} = {instance_name}.dequeue() → {result['value']}"
-                        result["assignment"] = {"variable": var_name, "value": result["value"]}
-                    
-                    state = self._create_current_state()
-                    state["step_detail"] = result
-                    steps.append(create_step_func(step_number, line_number, line, result["message"], state))
-                    return True
-                
-                # Handle front() method assignment
-                if method_name == "front" and instance.get("class_type") == "ArrayQueue":
-                    result = self.node_manager.queue_front(instance, instance_name)
-                    if result.get("value") is not None:
-                        self.context["variables"][var_name] = result["value"]
-                        result["message"] = f"Assigned {var_name} = {instance_name}.front() → {result['value']}"
-                        result["assignment"] = {"variable": var_name, "value": result["value"]}
-                    
-                    state = self._create_current_state()
-                    state["step_detail"] = result
-                    steps.append(create_step_func(step_number, line_number, line, result["message"], state))
-                    return True
-                
-                # Handle back() method assignment
-                if method_name == "back" and instance.get("class_type") == "ArrayQueue":
-                    result = self.node_manager.queue_back(instance, instance_name)
+                queue_method = self._assignable_methods.get(method_name)
+                if queue_method is not None and instance.get("class_type") == ARRAY_QUEUE:
+                    result = queue_method(instance, instance_name)
                     if result.get("value") is not None:
                         self.context["variables"][var_name] = result["value"]
-                        result["message"] = f"Assigned {var_name} = {instance_name}.back() → {result['value']}"
+                        result["message"] = f"Assigned {var_name} = {instance_name}.{method_name}() → {result['value']}"
                         result["assignment"] = {"variable": var_name, "value": result["value"]}
                     
                     state = self._create_current_state()
@@ -153,10 +168,12 @@ class QueueStatementParser:
     def _handle_simple_assignment(self, line: str, line_number: int, step_number: int, 
                                  steps: List[ExecutionStepSchema], create_step_func) -> bool:
         """Handle simple variable assignments"""
-        simple_assignment_match = re.match(r"(\w+)\s*=\s*(.+)", line)
-        if simple_assignment_match and not line.count('.') and not line.count('('):
-            var_name = simple_assignment_match.group(1)
-            value_str = simple_assignment_match.group(2).strip()
+        # Attribute access and calls are handled elsewhere
+        if '.' in line or '(' in line:
+            return False
+        simple_assignment = _parse_simple_assignment(line)
+        if simple_assignment:
+            var_name, value_str = simple_assignment
             
             # Handle string literals
             if ((value_str.startswith('"') and value_str.endswith('"')) or 
@@ -179,7 +196,7 @@ class QueueStatementParser:
         """Handle function calls with better tracking"""
         
         # Function call with assignment
-        assignment_func_match = re.match(r"(\w+)\s*=\s*(\w+)\((.*?)\)", line)
+        assignment_func_match = _ASSIGNMENT_FUNC_RE.match(line)
         if assignment_func_match:
             var_name = assignment_func_match.group(1)
             func_name = assignment_func_match.group(2)
@@ -201,7 +218,7 @@ class QueueStatementParser:
                 return True
         
         # Direct function call
-        func_call_match = re.match(r"(\w+)\((.*?)\)", line)
+        func_call_match = _DIRECT_FUNC_RE.match(line)
         if func_call_match:
             func_name = func_call_match.group(1)
             args = func_call_match.group(2)
@@ -230,24 +247,59 @@ class QueueStatementParser:
     
     def _create_current_state(self) -> Dict[str, Any]:
         """Create current state snapshot for step tracking"""
-        state = {
-            "instances": {},
-            "variables": self.context["variables"].copy(),
-            "stdout": self.context["stdout"].copy(),
-            "active": self.context.get("active_instance")
-        }
-        
         # Add detailed instance states
+        instance_states = {}
         for name, instance in self.context["instances"].items():
-            if instance.get("class_type") == "ArrayQueue":
-                state["instances"][name] = {
-                    "type": "ArrayQueue",
-                    "data": instance["data"].copy(),
-                    "size": len(instance["data"]),
-                    "isEmpty": len(instance["data"]) == 0,
-                    "front": instance["data"][0] if instance["data"] else None,
-                    "back": instance["data"][-1] if instance["data"] else None
-                }
+            if instance.get("class_type") == ARRAY_QUEUE:
+                instance_states[name] = self._queue_state(name, instance)
+        # Usually every queue display was reused, so the previous mapping can be shared as well
+        previous_states = self._snapshots.get("instances")
+        if (previous_states is not None and len(previous_states) == len(instance_states)
+                and all(previous_states.get(name) is state for name, state in instance_states.items())):
+            instance_states = previous_states
+        else:
+            self._snapshots["instances"] = instance_states
         
-        return state
+        return {
+            "instances": instance_states,
+            "variables": self._snapshot("variables", self.context["variables"]),
+            "stdout": self._snapshot("stdout", self.context["stdout"]),
+            "active": self.context.get("active_instance")
+        }
+    
+    def _snapshot(self, key: Any, container: Any) -> Any:
+        """Return a shallow copy of container, reusing the previous copy while it holds the same objects"""
+        previous = self._snapshots.get(key)
+        # Compare by identity: 1, 1.0 and True are equal but must not share a snapshot
+        if previous is not None and len(previous) == len(container):
+            if isinstance(container, dict):
+                unchanged = all(old_name == name and old is value for (old_name, old), (name, value)
+                                in zip(previous.items(), container.items()))
+            else:
+                unchanged = all(old is value for old, value in zip(previous, container))
+            if unchanged:
+                return previous
+        snapshot = container.copy()
+        self._snapshots[key] = snapshot
+        return snapshot
+    
+    def _queue_state(self, name: str, instance: Dict[str, Any]) -> Dict[str, Any]:
+        """Display state of an ArrayQueue, rebuilt only after its data was mutated"""
+        key = ("queue", name)
+        mutations = instance.get("_mutations")
+        cached = self._snapshots.get(key)
+        if cached is not None and mutations is not None and cached[0] is instance and cached[1] == mutations:
+            return cached[2]
+        
+        data = list(instance["data"])
+        queue_state = {
+            "type": "ArrayQueue",
+            "data": data,
+            "size": len(data),
+            "isEmpty": len(data) == 0,
+            "front": data[0] if data else None,
+            "back": data[-1] if data else None
+        }
+        self._snapshots[key] = (instance, mutations, queue_state)
+        return queue_state
 
@@ -1,12 +1,40 @@
-from typing import List, Dict, Any
+from itertools import islice
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, Optional, Tuple
 from datetime import datetime
 from app.schemas.playground import ExecutionStepSchema
 from app.services.simulators.common.base_simulator import BaseSimulator, FunctionDefinitionTracker
 from app.services.simulators.queue.enhanced_queue_operation_parser import EnhancedQueueOperationParser
+from app.services.simulators.queue.queue_node_manager import ARRAY_QUEUE
 from app.services.simulators.operations.ast_parser import ASTParser
 from app.services.simulators.operations.error_handler import ErrorHandler
 from app.utils.messages_th import get_class_defined_message, get_message
 
+# Read-only stand-in for steps without a step_detail
+_NO_STEP_DETAIL: Mapping[str, Any] = MappingProxyType({})
+
+
+def _print_info(step: ExecutionStepSchema) -> Tuple[bool, Optional[Any]]:
+    """Return whether a step is a print step and the output it carries, reading step_detail once"""
+    step_detail = step.state.get("step_detail") or _NO_STEP_DETAIL
+    output = step_detail.get("output")
+    return step_detail.get("operation") == "print" or bool(output), output
+
+
+def _classify_code(code: str) -> Dict[str, bool]:
+    """Collect the routing flags for a queue program, scanning the source as few times as possible"""
+    has_class_definition = 'class ArrayQueue:' in code
+    has_class_array_queue = has_class_definition or 'class ArrayQueue' in code
+    has_input = 'input(' in code
+    return {
+        "has_input": has_input,
+        "has_fstring": 'f"' in code or "f'" in code,
+        "has_class_definition": has_class_definition,
+        "is_simulation_class": has_class_array_queue or (not has_input and 'ArrayQueue' in code),
+        # A queue class definition is also what makes the real trace preferable
+        "is_simulation": has_class_array_queue or ('class ' in code and ('Queue' in code or 'queue' in code)),
+    }
+
 
 class QueueSimulator(BaseSimulator):
     """Enhanced Queue simulator with detailed step-by-step execution tracking"""
@@ -16,21 +44,31 @@ class QueueSimulator(BaseSimulator):
         self.ast_parser = ASTParser()
         from app.services.simulators.direct_code_executor import DirectCodeExecutor
         self.direct_executor = DirectCodeExecutor()
+    
+    def reset_context(self):
+        """Reset the context and drop displays cached for the previous run"""
+        super().reset_context()
+        # id(instance) -> (instance, mutation count, display)
+        self._display_cache: Dict[int, tuple] = {}
         
     def execute_code(self, code: str, exec_id: str, created_at: datetime) -> List[ExecutionStepSchema]:
         """Execute queue code with detailed step-by-step tracking"""
         steps = []
         step_number = 1  # Initialize before try block to handle early exceptions
         self.reset_context()
+        # Split once; the main loop and the error paths share the lines. split('\n') rather than
+        # splitlines() keeps line numbers aligned with the real run, which treats \x0c etc. as text
+        lines = code.split('\n')
         
         try:
             # Check if code should be executed directly (e.g. input/print or custom class)
             # If code contains 'class ArrayQueue' it might be a custom implementation or simulation
             # If code DOES NOT contain 'class ArrayQueue' but uses ArrayQueue operations, it's a simulation
             # If code contains input() or arbitrary classes, use direct executor
-            has_input = 'input(' in code
-            has_fstring = 'f"' in code or "f'" in code
-            is_simulation_class = 'class ArrayQueue' in code or ('ArrayQueue' in code and not has_input)
+            code_flags = _classify_code(code)
+            has_input = code_flags["has_input"]
+            has_fstring = code_flags["has_fstring"]
+            is_simulation_class = code_flags["is_simulation_class"]
             
             # Log the decision factors
             print(f"DEBUG: QueueSimulator decision - has_input={has_input}, has_fstring={has_fstring}, is_simulation_class={is_simulation_class}", flush=True)
@@ -52,7 +90,7 @@ class QueueSimulator(BaseSimulator):
             # Parse the entire code using AST to catch syntax errors early
             self.ast_parser.parse_code(code)
             # Check if code contains class definition
-            has_class_definition = 'class ArrayQueue:' in code
+            has_class_definition = code_flags["has_class_definition"]
             
             # Initialize ArrayQueue class only if needed
             if has_class_definition:
@@ -76,18 +114,36 @@ class QueueSimulator(BaseSimulator):
                 step_number = 1
             
             # Process each line of executable code
-            lines = code.split('\n')
-            
             operation_parser = EnhancedQueueOperationParser(self.context)
             
             # Track function definition state
             function_tracker = FunctionDefinitionTracker()
             
-            # Track accumulated stdout
-            accumulated_stdout = []
+            # Outputs captured from the real run are kept at the start of the context's stdout list,
+            # which the step snapshots copy; output the operation parser appends after them
+            # (e.g. printQueue) is dropped at the next capture. The set is for the membership checks
+            accumulated_stdout = self.context["stdout"]
+            captured_count = 0
+            seen_stdout = set()
             
             # Keep track of last processed line to find skipped outputs
             last_processed_line = 0
+            # Execution steps ordered by line; a cursor hands each one out once, when its line is passed
+            steps_by_line = sorted(range(len(execution_steps or ())), key=lambda i: execution_steps[i].line)
+            exec_cursor = 0
+            
+            # Print flag and output per execution step, plus the print steps in order and by line
+            # (first one wins), all read from step_detail once
+            exec_print_info = [_print_info(exec_step) for exec_step in execution_steps or ()]
+            print_steps = []
+            first_print_by_line = {}
+            for exec_step, (is_print_step, _) in zip(execution_steps or (), exec_print_info):
+                if is_print_step:
+                    print_steps.append(exec_step)
+                    first_print_by_line.setdefault(exec_step.line, exec_step)
+            # Number of print steps among steps[:counted_steps], advanced only when needed
+            print_count_before = 0
+            counted_steps = 0
             
             for line_number, line in enumerate(lines, 1):
                 original_line = line
@@ -103,14 +159,22 @@ class QueueSimulator(BaseSimulator):
                 
                 # Check for skipped outputs between last_processed and current
                 # This captures outputs from lines we skipped (e.g. inside class/function defs)
-                if execution_steps:
-                    for s in execution_steps:
-                        if last_processed_line < s.line < line_number:
-                             # This step corresponds to a skipped line
-                             out = s.state.get("step_detail", {}).get("output")
-                             if out and out not in accumulated_stdout:
-                                 accumulated_stdout.append(out)
-                                 self.context["stdout"] = list(accumulated_stdout)
+                # A step seen once never adds output later, so only newly passed steps are checked
+                skipped = []
+                while exec_cursor < len(steps_by_line) and execution_steps[steps_by_line[exec_cursor]].line < line_number:
+                    index = steps_by_line[exec_cursor]
+                    # Steps on a line that was itself processed are never skipped outputs
+                    if execution_steps[index].line > last_processed_line:
+                        skipped.append(index)
+                    exec_cursor += 1
+                # Keep execution order among the steps that correspond to skipped lines
+                for index in sorted(skipped):
+                    out = exec_print_info[index][1]
+                    if out and out not in seen_stdout:
+                        del accumulated_stdout[captured_count:]
+                        accumulated_stdout.append(out)
+                        captured_count += 1
+                        seen_stdout.add(out)
                 
                 # Update last processed line to current (will be updated again if we process it)
                 # If we skip this line (below), we still want to have checked the gap before it
@@ -128,25 +192,25 @@ class QueueSimulator(BaseSimulator):
                 execution_step_for_line = None
                 if is_print_statement and execution_steps:
                     # Find the corresponding execution step for this print statement
-                    for exec_step in execution_steps:
-                        step_detail = exec_step.state.get("step_detail", {})
-                        if exec_step.line == line_number and (step_detail.get("operation") == "print" or step_detail.get("output")):
-                            execution_step_for_line = exec_step
-                            break
+                    execution_step_for_line = first_print_by_line.get(line_number)
                     
                     if not execution_step_for_line:
                          # Try to find by order if line match fails (sometimes lines shift)
-                         print_steps = [s for s in execution_steps if s.state.get("step_detail", {}).get("operation") == "print" or s.state.get("step_detail", {}).get("output")]
-                         print_count_before = sum(1 for s in steps if s.state.get("step_detail", {}).get("operation") == "print" or s.state.get("step_detail", {}).get("output"))
+                         for s in islice(steps, counted_steps, None):
+                             if _print_info(s)[0]:
+                                 print_count_before += 1
+                         counted_steps = len(steps)
                          if print_count_before < len(print_steps):
                              execution_step_for_line = print_steps[print_count_before]
 
                 # If we found an execution step with actual output, use it instead of processing the line
                 if execution_step_for_line:
-                     actual_output = execution_step_for_line.state.get("step_detail", {}).get("output")
+                     actual_output = _print_info(execution_step_for_line)[1]
                      if actual_output:
+                        del accumulated_stdout[captured_count:]
                         accumulated_stdout.append(actual_output)
-                        self.context["stdout"] = list(accumulated_stdout)
+                        captured_count += 1
+                        seen_stdout.add(actual_output)
                         
                         execution_step_for_line.state["message"] = f"Print: {actual_output}"
                         execution_step_for_line.state["stdout"] = list(accumulated_stdout)
@@ -165,9 +229,6 @@ class QueueSimulator(BaseSimulator):
                             step_number += 1
                     
                     except Exception as e:
-                        steps.append(self._create_execution_step(
-                            step_number, line_number, stripped_line, error=str(e)
-                        ))
                         steps.append(self._create_execution_step(
                             step_number, line_number, stripped_line, error=str(e)
                         ))
@@ -179,7 +240,7 @@ class QueueSimulator(BaseSimulator):
             # If execution_steps are more detailed, return them instead
             # This ensures line-by-line trace data is used for debugging
             if execution_steps:
-                is_simulation = 'class ' in code and ('Queue' in code or 'queue' in code)
+                is_simulation = code_flags["is_simulation"]
                 if len(execution_steps) > len(steps) or len(steps) <= 1 or is_simulation:
                     return execution_steps
         
@@ -197,7 +258,6 @@ class QueueSimulator(BaseSimulator):
             
             # Try to get the problematic line from code
             if error_line > 0:
-                lines = code.split('\n')
                 if error_line <= len(lines):
                     code_line = lines[error_line - 1]
             
@@ -259,7 +319,7 @@ class QueueSimulator(BaseSimulator):
             
             if not steps:
                 error_step = self._create_execution_step(
-                    step_number, 0, code.split('\n')[0] if code else "",
+                    step_number, 0, lines[0],
                     error=error_info["thai_message"],
                     state={
                         "error": error_info.get("python_style_message", error_info["thai_message"]),
@@ -341,14 +401,23 @@ class QueueSimulator(BaseSimulator):
     
     def _get_instance_display(self, instance):
         """Get display representation of queue instances"""
-        if instance.get("class_type") == "ArrayQueue":
-            return {
+        if instance.get("class_type") == ARRAY_QUEUE:
+            # Reuse the last display until the queue data is mutated again
+            mutations = instance.get("_mutations")
+            cached = self._display_cache.get(id(instance))
+            if cached is not None and mutations is not None and cached[0] is instance and cached[1] == mutations:
+                return cached[2]
+            
+            data = list(instance.get("data", []))
+            display = {
                 "type": "ArrayQueue",
-                "data": instance.get("data", []),
-                "size": len(instance.get("data", [])),
-                "isEmpty": len(instance.get("data", [])) == 0,
-                "front": instance.get("data", [])[0] if instance.get("data", []) else None,
-                "back": instance.get("data", [])[-1] if instance.get("data", []) else None
+                "data": data,
+                "size": len(data),
+                "isEmpty": len(data) == 0,
+                "front": data[0] if data else None,
+                "back": data[-1] if data else None
             }
+            self._display_cache[id(instance)] = (instance, mutations, display)
+            return display
         return super()._get_instance_display(instance)
 
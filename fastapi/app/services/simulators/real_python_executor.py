@@ -1,45 +1,53 @@
+import codecs
+import hashlib
 import subprocess
 import json
+import locale
 import sys
-import io
-from typing import Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 from dataclasses import dataclass
-from contextlib import redirect_stdout
+from app.services.simulators.worker_pool import WorkerStartError, get_worker_pool
 
+try:
+    import orjson
+except ImportError:  # optional speedup, the stdlib parser is used without it
+    orjson = None
 
-@dataclass
-class ExecutionResult:
-    """Result of Python code execution"""
-    stdout: str
-    stderr: str
-    exit_code: int
-    timed_out: bool = False
-    output: Optional[Dict[str, Any]] = None  # Parsed JSON output if available
 
+# Child interpreters use the locale encoding for their standard streams,
+# the same one text-mode pipes would decode with
+_STREAM_ENCODING = locale.getpreferredencoding(False)
+_UTF8_STREAMS = codecs.lookup(_STREAM_ENCODING).name == "utf-8"
 
-class RealPythonExecutor:
-    """Executes Python code in real Python interpreter (not simulation)"""
-    
-    def __init__(self, use_docker: bool = False, timeout: int = 30, memory: str = "256m"):
-        """
-        Initialize the executor
-        
-        Args:
-            use_docker: If True, use Docker for execution (more secure but requires Docker)
-            timeout: Execution timeout in seconds
-            memory: Memory limit for Docker (if used)
-        """
-        self.use_docker = use_docker
-        self.timeout = timeout
-        self.memory = memory
-        self.python_image = "python:3.11"
-    
-    def wrap_user_code(self, user_code: str) -> str:
-        """
-        Wrap user code with JSON output wrapper
-        Similar to Go backend's wrapUserCode function
-        """
-        wrapper = '''import json
+
+def _decode_stream(data: bytes, errors: str = "strict") -> str:
+    """Decode child output the way a text-mode pipe would, universal newlines included"""
+    text = data.decode(_STREAM_ENCODING, errors)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _loads_output(text: str, raw: Optional[bytes] = None) -> Any:
+    """
+    Parse the wrapper's JSON output, with orjson when it is installed
+
+    raw is the undecoded output text came from, if available; orjson
+    parses UTF-8 bytes directly instead of re-encoding the string.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(raw.strip() if raw is not None and _UTF8_STREAMS else text)
+        except orjson.JSONDecodeError:
+            # orjson rejects some input the stdlib accepts, e.g. NaN or integers above 64 bits
+            pass
+    return json.loads(text)
+
+
+# JSON output wrapper around the user code, split once at the slot the code goes in
+_WRAPPER_PREFIX, _WRAPPER_SUFFIX = '''import json
 import sys
 import io
 import re
@@ -47,7 +55,7 @@ from contextlib import redirect_stdout
 
 try:
     # Read JSON input from stdin (if any)
-    input_data = {{}}
+    input_data = {}
     try:
         stdin_input = sys.stdin.read().strip()
         if stdin_input:
@@ -73,24 +81,126 @@ try:
     
     # Wrap output appropriately
     if len(output_lines) == 1:
-        result = {{"output": output_lines[0]}}
+        result = {"output": output_lines[0]}
     elif len(output_lines) > 1:
-        result = {{"output": output_lines}}
+        result = {"output": output_lines}
     else:
-        result = {{"output": ""}}
+        result = {"output": ""}
     
     # Output as JSON
     print(json.dumps(result, ensure_ascii=False, separators=(',', ':')))
 
 except Exception as e:
     # Handle errors gracefully
-    error_info = {{"error": str(e)}}
+    error_info = {"error": str(e)}
     print(json.dumps(error_info, ensure_ascii=False))
-'''
-        # Indent user code properly
-        indented_code = '\n'.join('        ' + line for line in user_code.split('\n'))
-        final_code = wrapper.format(user_code=indented_code)
-        return final_code
+'''.split("{user_code}")
+# User code sits inside the wrapper's `with redirect_stdout(...)` block
+_INDENT = '        '
+# Results kept per executor when result caching is enabled
+_RESULT_CACHE_SIZE = 512
+# Default output kept per stream of a run; a runaway print loop must not exhaust the API worker's memory
+_MAX_OUTPUT_BYTES = 1 << 20
+_READ_SIZE = 65536
+
+
+def _digest(text: str) -> bytes:
+    """Short fixed-size key for a possibly large source or input"""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def _feed(stream, data: bytes) -> None:
+    """Write data to a child's stdin and close it; a child that exits early is not an error"""
+    try:
+        if data:
+            stream.write(data)
+        stream.close()
+    except OSError:
+        pass
+
+
+def _drain(stream, buffer: bytearray, limit: int) -> None:
+    """Read a child's output to EOF, keeping one byte past the limit to tell it was cut"""
+    for chunk in iter(lambda: stream.read(_READ_SIZE), b""):
+        if len(buffer) <= limit:
+            buffer += chunk[:limit + 1 - len(buffer)]
+    stream.close()
+
+
+def _communicate_bounded(process: subprocess.Popen, stdin_data: bytes,
+                         timeout: float, limit: int) -> Tuple[bytes, bytes, bool, bool]:
+    """
+    Popen.communicate with each output stream capped at limit bytes
+
+    Returns (stdout, stderr, timed_out, truncated); on timeout the process is killed.
+    """
+    stdout, stderr = bytearray(), bytearray()
+    threads = [
+        threading.Thread(target=_feed, args=(process.stdin, stdin_data), daemon=True),
+        threading.Thread(target=_drain, args=(process.stdout, stdout, limit), daemon=True),
+        threading.Thread(target=_drain, args=(process.stderr, stderr, limit), daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        process.wait(timeout=timeout)
+        timed_out = False
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        timed_out = True
+    for thread in threads:
+        thread.join()
+
+    truncated = len(stdout) > limit or len(stderr) > limit
+    return bytes(stdout[:limit]), bytes(stderr[:limit]), timed_out, truncated
+
+
+@dataclass(slots=True, frozen=True)
+class ExecutionResult:
+    """Result of Python code execution"""
+    stdout: str
+    stderr: str
+    exit_code: int
+    timed_out: bool = False
+    output: Optional[Dict[str, Any]] = None  # Parsed JSON output if available
+
+
+class RealPythonExecutor:
+    """Executes Python code in real Python interpreter (not simulation)"""
+    
+    def __init__(self, use_docker: bool = False, timeout: int = 30, memory: str = "256m",
+                 use_worker_pool: bool = True, cache_enabled: bool = False,
+                 max_output_bytes: int = _MAX_OUTPUT_BYTES):
+        """
+        Initialize the executor
+        
+        Args:
+            use_docker: If True, use Docker for execution (more secure but requires Docker)
+            timeout: Execution timeout in seconds
+            memory: Memory limit for Docker (if used)
+            use_worker_pool: If True, fork subprocess runs from warm pooled workers instead of
+                starting a new interpreter for each run
+            cache_enabled: If True, execute() returns the earlier result for an identical
+                successful run (same code, stdin and wrapping); only for deterministic code
+            max_output_bytes: Output kept per stream of a subprocess run; the rest is discarded
+        """
+        self.use_docker = use_docker
+        self.timeout = timeout
+        self.memory = memory
+        self.use_worker_pool = use_worker_pool
+        self.cache_enabled = cache_enabled
+        self.max_output_bytes = max_output_bytes
+        self.python_image = "python:3.11"
+        self._result_cache: "OrderedDict[tuple, ExecutionResult]" = OrderedDict()
+        self._result_cache_lock = threading.Lock()
+    
+    def wrap_user_code(self, user_code: str) -> str:
+        """
+        Wrap user code with JSON output wrapper
+        Similar to Go backend's wrapUserCode function
+        """
+        return _WRAPPER_PREFIX + _INDENT + user_code.replace('\n', '\n' + _INDENT) + _WRAPPER_SUFFIX
     
     def execute_with_subprocess(self, code: str, stdin_data: str = "", skip_wrapping: bool = False) -> ExecutionResult:
         """
@@ -110,35 +220,32 @@ except Exception as e:
             else:
                 wrapped_code = self.wrap_user_code(code)
             
-            # Execute Python code
-            process = subprocess.Popen(
-                [sys.executable, '-c', wrapped_code],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1
-            )
-            
-            try:
-                stdout, stderr = process.communicate(
-                    input=stdin_data,
-                    timeout=self.timeout
-                )
-                exit_code = process.returncode
-                timed_out = False
-            except subprocess.TimeoutExpired:
-                process.kill()
-                stdout, stderr = process.communicate()
-                exit_code = -1
-                timed_out = True
-                stderr = "Code execution timed out"
+            # Execute Python code, in a process forked from a warm worker when possible
+            stdin_bytes = stdin_data.encode(_STREAM_ENCODING)
+            pool = get_worker_pool() if self.use_worker_pool else None
+            result = None
+            if pool is not None:
+                try:
+                    result = pool.run(wrapped_code, stdin_bytes, self.timeout, self.max_output_bytes)
+                except (WorkerStartError, UnicodeEncodeError):
+                    # Nothing ran yet; a fresh interpreter reports the problem the usual way.
+                    # A worker lost mid-run is not retried, so code never runs twice
+                    result = None
+            raw_stdout, raw_stderr, exit_code, timed_out, truncated = (
+                result or self._run_in_new_interpreter(wrapped_code, stdin_bytes))
+            # A cut can split a multi-byte character at the end
+            errors = "ignore" if truncated else "strict"
+            stdout = _decode_stream(raw_stdout, errors).strip()
+            stderr = "Code execution timed out" if timed_out else _decode_stream(raw_stderr, errors)
+            if truncated:
+                separator = "\n" if stderr and not stderr.endswith("\n") else ""
+                stderr += f"{separator}[output truncated to {self.max_output_bytes} bytes]\n"
             
             # Try to parse JSON output
             output = None
-            if stdout.strip():
+            if stdout:
                 try:
-                    output = json.loads(stdout.strip())
+                    output = _loads_output(stdout, raw_stdout)
                 except json.JSONDecodeError:
                     # If not JSON, keep as string
                     pass
@@ -156,7 +263,7 @@ except Exception as e:
                     logger.warning(f"Full stderr: {stderr[:500]}")
             
             return ExecutionResult(
-                stdout=stdout.strip(),
+                stdout=stdout,
                 stderr=stderr,
                 exit_code=exit_code,
                 timed_out=timed_out,
@@ -171,6 +278,22 @@ except Exception as e:
                 timed_out=False
             )
     
+    def _run_in_new_interpreter(self, wrapped_code: str, stdin_data: bytes):
+        """
+        Run code in a new Python process; returns (stdout, stderr, exit_code, timed_out, truncated),
+        output undecoded and each stream capped at max_output_bytes
+        """
+        process = subprocess.Popen(
+            [sys.executable, '-c', wrapped_code],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        
+        stdout, stderr, timed_out, truncated = _communicate_bounded(process, stdin_data, self.timeout, self.max_output_bytes)
+        exit_code = -1 if timed_out else process.returncode
+        return stdout, stderr, exit_code, timed_out, truncated
+    
     def execute_with_docker(self, code: str, stdin_data: str = "", skip_wrapping: bool = False) -> ExecutionResult:
         """
         Execute Python code using Docker (more secure, isolated)
@@ -212,8 +335,7 @@ except Exception as e:
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1
+                text=True
             )
             
             try:
@@ -234,7 +356,7 @@ except Exception as e:
             output = None
             if stdout.strip():
                 try:
-                    output = json.loads(stdout.strip())
+                    output = _loads_output(stdout.strip())
                 except json.JSONDecodeError:
                     # If not JSON, keep as string
                     pass
@@ -282,6 +404,27 @@ except Exception as e:
         Returns:
             ExecutionResult with execution results
         """
+        if not self.cache_enabled:
+            return self._execute_uncached(code, stdin_data, skip_wrapping)
+        
+        key = (_digest(code), _digest(stdin_data), skip_wrapping)
+        with self._result_cache_lock:
+            result = self._result_cache.get(key)
+            if result is not None:
+                self._result_cache.move_to_end(key)
+                return result
+        
+        result = self._execute_uncached(code, stdin_data, skip_wrapping)
+        # Failures and timeouts may be transient, only keep clean runs
+        if result.exit_code == 0 and not result.timed_out:
+            with self._result_cache_lock:
+                self._result_cache[key] = result
+                if len(self._result_cache) > _RESULT_CACHE_SIZE:
+                    self._result_cache.popitem(last=False)
+        return result
+    
+    def _execute_uncached(self, code: str, stdin_data: str, skip_wrapping: bool) -> ExecutionResult:
+        """Run code with the configured method"""
         if self.use_docker:
             return self.execute_with_docker(code, stdin_data, skip_wrapping)
         else:
@@ -48,4 +48,4 @@ class SimulatorFactory:
     @classmethod
     def is_supported(cls, data_type: str) -> bool:
         """Check if data type is supported"""
-        return data_type.lower() in cls._simulators and cls._simulators[data_type.lower()] is not None
\ No newline at end of file
+        return cls._simulators.get(data_type.lower()) is not None
\ No newline at end of file
@@ -1,37 +1,75 @@
 from typing import Dict, Any
 
+# Every byte but '(' and ')'; UTF-8 continuation bytes are never ASCII, so no other character matches
+_NOT_PARENS = bytes(b for b in range(256) if b not in b"()")
+
+
+def _parentheses_match(arg) -> bool:
+    """Simplified parentheses matching: an unmatched ')' is counted like an open one"""
+    # Counting runs in C; these cases need no scan
+    opens = arg.count('(')
+    closes = arg.count(')')
+    if (opens + closes) % 2:
+        # Every parenthesis moves the count by one, so it cannot end at zero
+        return False
+    if not opens:
+        # An even run of unmatched ')' cancels itself out
+        return True
+    if not closes:
+        return False
+
+    if isinstance(arg, str):
+        # Only the parentheses matter; drop everything else in one C pass before scanning
+        arg = arg.encode("utf-8", "surrogatepass").translate(None, _NOT_PARENS).decode("ascii")
+    stack_count = 0
+    for char in arg:
+        if char == '(':
+            stack_count += 1
+        elif char == ')':
+            if stack_count > 0:
+                stack_count -= 1
+            else:
+                stack_count += 1
+    return stack_count == 0
+
 
 class StackFunctionHandler:
     """Handles special stack-related functions like copyStack and utility functions"""
     
     def __init__(self, context: Dict[str, Any]):
         self.context = context
+        # The simulator keeps these dicts for the whole run, so they can be aliased;
+        # stdout is not, the simulator replaces that list as it goes
+        self._instances = context["instances"]
+        self._variables = context["variables"]
     
     def simulate_copy_stack(self, s1_name: str, s2_name: str) -> Dict[str, Any]:
         """Simulate the copyStack function with detailed tracking"""
-        if s1_name not in self.context["instances"] or s2_name not in self.context["instances"]:
+        if s1_name not in self._instances or s2_name not in self._instances:
             return {"operation": "copyStack", "error": "instances_not_found"}
         
-        s1 = self.context["instances"][s1_name]
-        s2 = self.context["instances"][s2_name]
+        s1 = self._instances[s1_name]
+        s2 = self._instances[s2_name]
         
-        # Record original states
+        # Record original states; s1 is left as it is, so one snapshot of it
+        # serves as its before/after and as s2's after
         original_s1 = s1["data"].copy()
         original_s2 = s2["data"].copy()
         
         # Simply copy s1's data to s2 (preserve s1, copy to s2)
         s2["data"] = s1["data"].copy()
+        s2["_mutations"] = s2.get("_mutations", 0) + 1
         
         # Record in history
         s1["history"].append({
             "operation": "copyStack",
             "before": original_s1,
-            "after": s1["data"].copy()
+            "after": original_s1
         })
         s2["history"].append({
             "operation": "copyStack", 
             "before": original_s2,
-            "after": s2["data"].copy()
+            "after": original_s1
         })
         
         return {
@@ -39,9 +77,9 @@ class StackFunctionHandler:
             "source": s1_name,
             "destination": s2_name,
             "source_before": original_s1,
-            "source_after": s1["data"].copy(),
+            "source_after": original_s1,
             "destination_before": original_s2,
-            "destination_after": s2["data"].copy()
+            "destination_after": original_s1
         }
     
     def simulate_function_call(self, func_name: str, args: str) -> Any:
@@ -60,21 +98,10 @@ class StackFunctionHandler:
     def _handle_parentheses_matching(self, args: str) -> bool:
         """Handle parentheses matching function"""
         arg = args.strip().strip('"\'')
-        if arg in self.context["variables"]:
-            arg = self.context["variables"][arg]
-        
-        # Simplified parentheses matching
-        stack_count = 0
-        for char in arg:
-            if char == '(':
-                stack_count += 1
-            elif char == ')':
-                if stack_count > 0:
-                    stack_count -= 1
-                else:
-                    stack_count += 1
+        if arg in self._variables:
+            arg = self._variables[arg]
         
-        result = stack_count == 0
+        result = _parentheses_match(arg)
         if not result:
             self.context["stdout"].append(f"Parentheses in {arg} are unmatched")
         return result
@@ -82,8 +109,8 @@ class StackFunctionHandler:
     def _handle_infix_to_postfix(self, args: str) -> str:
         """Handle infix to postfix conversion"""
         arg = args.strip().strip('"\'')
-        if arg in self.context["variables"]:
-            arg = self.context["variables"][arg]
+        if arg in self._variables:
+            arg = self._variables[arg]
         return f"{arg}_postfix"
     
     def _handle_copy_stack_call(self, args: str) -> Any:
@@ -91,6 +118,6 @@ class StackFunctionHandler:
         arg_parts = [arg.strip() for arg in args.split(',')]
         if len(arg_parts) == 2:
             s1_name, s2_name = arg_parts
-            if s1_name in self.context["instances"] and s2_name in self.context["instances"]:
+            if s1_name in self._instances and s2_name in self._instances:
                 return self.simulate_copy_stack(s1_name, s2_name)
         return None
\ No newline at end of file
@@ -1,5 +1,62 @@
 from typing import Dict, Any
-from app.services.simulators.stack.stack_node_manager import StackNodeManager
+from app.services.simulators.stack.stack_node_manager import ARRAY_STACK, StackNodeManager
+
+# Longer digit strings can exceed the interpreter's int() digit limit (never set below 640)
+_MAX_FAST_DIGITS = 640
+
+
+# Analyzer behavior types -> handler method names
+_BEHAVIOR_DISPATCH = {
+    "push": "_handle_push",
+    "pop": "_handle_pop",
+    "size": "_handle_size",
+    "handler_size": "_handle_size",  # behavior analyzer might return this
+    "is_empty": "_handle_is_empty",
+    "stackTop": "_handle_stack_top",
+    "peek": "_handle_stack_top",
+    "printStack": "_handle_print_stack",
+    "print": "_handle_print_stack"
+}
+
+# Method names (and their common aliases) -> handler method names
+_METHOD_DISPATCH = {
+    # Push variants
+    "push": "_handle_push",
+    "add": "_handle_push",
+    "insert": "_handle_push",
+
+    # Pop variants
+    "pop": "_handle_pop",
+    "remove": "_handle_pop",
+    "delete": "_handle_pop",
+
+    # Size variants
+    "size": "_handle_size",
+    "get_size": "_handle_size",
+    "count": "_handle_size",
+    "length": "_handle_size",
+    "__len__": "_handle_size",
+
+    # Empty check variants
+    "is_empty": "_handle_is_empty",
+    "empty": "_handle_is_empty",
+    "isempty": "_handle_is_empty",
+
+    # Top/Peek variants
+    "stackTop": "_handle_stack_top",
+    "get_stack_top": "_handle_stack_top",
+    "peek": "_handle_stack_top",
+    "top": "_handle_stack_top",
+    "get_top": "_handle_stack_top",
+
+    # Print variants
+    "printStack": "_handle_print_stack",
+    "print_stack": "_handle_print_stack",
+    "display": "_handle_print_stack",
+    "show": "_handle_print_stack",
+    "__str__": "_handle_print_stack",
+    "__repr__": "_handle_print_stack"
+}
 
 
 class StackMethodExecutor:
@@ -7,87 +64,34 @@ class StackMethodExecutor:
     
     def __init__(self, context: Dict[str, Any]):
         self.context = context
+        # Aliased once; the simulator keeps this dict for the whole run
+        self._variables = context["variables"]
         self.node_manager = StackNodeManager(context)
     
     def execute_method(self, instance: Dict[str, Any], instance_name: str, 
                       method_name: str, params: str) -> Dict[str, Any]:
         """Execute ArrayStack methods with enhanced tracking"""
-        if instance.get("class_type") != "ArrayStack":
+        if instance.get("class_type") != ARRAY_STACK:
             return {"message": f"Unknown method {method_name}", "operation": method_name}
         
         # Check available behaviors from context first
+        handler_name = None
         if "classes" in self.context and isinstance(self.context["classes"], dict):
             # Find the class and its method behaviors
             class_type = instance.get("class_type")
             if class_type and class_type in self.context["classes"]:
                  methods = self.context["classes"][class_type].get("methods", {})
                  if isinstance(methods, dict) and method_name in methods:
-                     method_info = methods[method_name]
-                     behavior_type = method_info.get("behavior_type")
-                     
-                     # Map behavior types to handlers
-                     behavior_map = {
-                         "push": self._handle_push,
-                         "pop": self._handle_pop,
-                         "size": self._handle_size,
-                         "handler_size": self._handle_size, # behavior analyzer might return this
-                         "is_empty": self._handle_is_empty,
-                         "stackTop": self._handle_stack_top,
-                         "peek": self._handle_stack_top,
-                         "printStack": self._handle_print_stack,
-                         "print": self._handle_print_stack
-                     }
-                     
-                     if behavior_type in behavior_map:
-                         return behavior_map[behavior_type](instance, instance_name, params)
+                     handler_name = _BEHAVIOR_DISPATCH.get(methods[method_name].get("behavior_type"))
 
-        method_map = {
-            # Push variants
-            "push": self._handle_push,
-            "add": self._handle_push,
-            "insert": self._handle_push,
-            
-            # Pop variants
-            "pop": self._handle_pop,
-            "remove": self._handle_pop,
-            "delete": self._handle_pop,
-            
-            # Size variants
-            "size": self._handle_size,
-            "get_size": self._handle_size,
-            "count": self._handle_size,
-            "length": self._handle_size,
-            "__len__": self._handle_size,
-            
-            # Empty check variants
-            "is_empty": self._handle_is_empty,
-            "empty": self._handle_is_empty,
-            "isempty": self._handle_is_empty,
-            
-            # Top/Peek variants
-            "stackTop": self._handle_stack_top,
-            "get_stack_top": self._handle_stack_top,
-            "peek": self._handle_stack_top,
-            "top": self._handle_stack_top,
-            "get_top": self._handle_stack_top,
-            
-            # Print variants
-            "printStack": self._handle_print_stack,
-            "print_stack": self._handle_print_stack,
-            "display": self._handle_print_stack,
-            "show": self._handle_print_stack,
-            "__str__": self._handle_print_stack,
-            "__repr__": self._handle_print_stack
+        handler_name = handler_name or _METHOD_DISPATCH.get(method_name)
+        if handler_name:
+            return getattr(self, handler_name)(instance, instance_name, params)
+        return {
+            "message": f"Unknown method {method_name}", 
+            "operation": method_name, 
+            "error": "unknown_method"
         }
-        
-        if method_name in method_map:
-            return method_map[method_name](instance, instance_name, params)
-        else:
-            return {
-                "message": f"Unknown method {method_name}", 
-                "operation": method_name, 
-                "error": "unknown_method"
-            }
     
     def _handle_push(self, instance: Dict[str, Any], instance_name: str, params: str) -> Dict[str, Any]:
         """Handle push operation"""
@@ -129,17 +133,25 @@ class StackMethodExecutor:
            (params.startswith("'") and params.endswith("'")):
             return params[1:-1]
         
-        # Number
-        try:
-            if '.' in params:
-                return float(params)
-            else:
-                return int(params)
-        except ValueError:
-            pass
+        # Number: plain integers and decimals are recognized without raising
+        digits = params[1:] if params[:1] in ("+", "-") else params
+        if digits.isdecimal() and len(digits) <= _MAX_FAST_DIGITS:
+            return int(params)
+        whole, dot, fraction = digits.partition('.')
+        if dot and (whole or fraction) and (not whole or whole.isdecimal()) and (not fraction or fraction.isdecimal()):
+            return float(params)
+        if digits[:1].isdecimal() or digits[:1] == '.':
+            # Rarer numeric forms such as 1_000 or 1.5e3
+            try:
+                if '.' in params:
+                    return float(params)
+                else:
+                    return int(params)
+            except ValueError:
+                pass
         
         # Variable reference
-        if params in self.context["variables"]:
-            return self.context["variables"][params]
+        if params in self._variables:
+            return self._variables[params]
         
         return params
\ No newline at end of file
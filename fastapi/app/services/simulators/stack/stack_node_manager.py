@@ -2,30 +2,44 @@ from typing import Dict, Any
 from app.services.simulators.operations.node_manager import NodeManager
 from app.utils.messages_th import get_stack_message, get_message
 
+# class_type tag of ArrayStack instances; compare against this one interned object
+ARRAY_STACK = "ArrayStack"
+
+# Messages for failed operations never change, so build them once
+_EMPTY_SUFFIX = " - " + get_message("traverse_empty")
+_POP_EMPTY_MESSAGE = "ลบข้อมูลออกจาก stack ที่ตำแหน่งบนสุด" + _EMPTY_SUFFIX
+_TOP_EMPTY_MESSAGE = "ดูข้อมูลที่ตำแหน่งบนสุดของ stack โดยไม่ลบออก" + _EMPTY_SUFFIX
+
 
 class StackNodeManager(NodeManager):
     """Enhanced Stack-specific node manager for ArrayStack operations"""
     
     def create_instance_data(self, class_name: str) -> Dict[str, Any]:
         """Create new instance data structure for ArrayStack"""
-        if class_name == "ArrayStack":
+        if class_name == ARRAY_STACK:
             return {
                 "data": [],
-                "class_type": class_name,
+                # The shared tag rather than the parsed name, so class_type checks succeed on identity
+                "class_type": ARRAY_STACK,
                 "attributes": {},
-                "history": []  # Track operation history
+                "history": [],  # Track operation history
+                "_mutations": 0  # Bumped on every change to data, lets snapshots be reused
             }
         return super().create_instance_data(class_name)
     
     def create_instance(self, var_name: str, class_name: str) -> str:
         """Create a new instance of a class"""
-        if class_name == "ArrayStack":
+        if class_name == ARRAY_STACK:
             self.context["instances"][var_name] = self.create_instance_data(class_name)
             self.context["active_instance"] = var_name
             return get_message("instance_created_generic", class_name=class_name, var_name=var_name)
         else:
             return super().create_instance(var_name, class_name)
     
+    def _stack_changed(self, instance: Dict[str, Any]) -> None:
+        """Mark the stack data as changed so cached snapshots are rebuilt"""
+        instance["_mutations"] = instance.get("_mutations", 0) + 1
+    
     def stack_push(self, instance: Dict[str, Any], value: Any, instance_name: str = "") -> Dict[str, Any]:
         """Push value to stack with detailed tracking"""
         # Check for overflow if max_size is defined
@@ -42,14 +56,14 @@ class StackNodeManager(NodeManager):
         
         old_data = instance["data"].copy()
         instance["data"].append(value)
+        self._stack_changed(instance)
         new_data = instance["data"].copy()
         
-        # Record operation in history
+        # Record operation in history as a diff; the full arrays only go out in the response
         instance["history"].append({
             "operation": "push",
             "value": value,
-            "before": old_data,
-            "after": new_data
+            "index": len(old_data)
         })
         
         return {
@@ -66,7 +80,7 @@ class StackNodeManager(NodeManager):
         """Pop value from stack with detailed tracking"""
         if not instance["data"]:
             return {
-                "message": "ลบข้อมูลออกจาก stack ที่ตำแหน่งบนสุด" + " - " + get_message("traverse_empty"),
+                "message": _POP_EMPTY_MESSAGE,
                 "operation": "pop",
                 "value": None,
                 "error": "underflow",
@@ -76,14 +90,14 @@ class StackNodeManager(NodeManager):
         
         old_data = instance["data"].copy()
         value = instance["data"].pop()
+        self._stack_changed(instance)
         new_data = instance["data"].copy()
         
-        # Record operation in history
+        # Record operation in history as a diff; the full arrays only go out in the response
         instance["history"].append({
             "operation": "pop",
             "value": value,
-            "before": old_data,
-            "after": new_data
+            "index": len(new_data)
         })
         
         return {
@@ -100,7 +114,7 @@ class StackNodeManager(NodeManager):
         """Get top value of stack"""
         if not instance["data"]:
             return {
-                "message": "ดูข้อมูลที่ตำแหน่งบนสุดของ stack โดยไม่ลบออก" + " - " + get_message("traverse_empty"),
+                "message": _TOP_EMPTY_MESSAGE,
                 "operation": "stackTop",
                 "value": None,
                 "error": "empty_stack",
@@ -130,7 +144,7 @@ class StackNodeManager(NodeManager):
     
     def stack_is_empty(self, instance: Dict[str, Any], instance_name: str = "") -> Dict[str, Any]:
         """Check if stack is empty"""
-        is_empty = len(instance["data"]) == 0
+        is_empty = not instance["data"]
         return {
             "message": f"ตรวจสอบว่า stack ว่างเปล่าหรือไม่ → คืนค่า {is_empty}",
             "operation": "is_empty",
@@ -1,9 +1,31 @@
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from app.schemas.playground import ExecutionStepSchema
 from app.services.simulators.stack.stack_method_executor import StackMethodExecutor
 from app.services.simulators.stack.stack_function_handler import StackFunctionHandler
-from app.services.simulators.stack.stack_node_manager import StackNodeManager
+from app.services.simulators.stack.stack_node_manager import ARRAY_STACK, StackNodeManager
+
+_INSTANTIATION_RE = re.compile(r"(\w+)\s*=\s*(\w+)\s*\(\s*\)")
+_METHOD_CALL_RE = re.compile(r"(\w+)\.(\w+)\s*\((.*?)\)")
+_ASSIGNMENT_FROM_METHOD_RE = re.compile(r"(\w+)\s*=\s*(\w+)\.(\w+)\s*\((.*?)\)")
+_SIMPLE_ASSIGNMENT_RE = re.compile(r"(\w+)\s*=\s*(.+)")
+_ASSIGNMENT_FUNC_RE = re.compile(r"(\w+)\s*=\s*(\w+)\((.*?)\)")
+_DIRECT_FUNC_RE = re.compile(r"(\w+)\((.*?)\)")
+# Every statement form starts with a word followed by '=', '.' or '(', which decides the candidate handlers
+_STATEMENT_HEAD_RE = re.compile(r"\w+(?:(?P<assignment>\s*=)|(?P<attribute>\.)|(?P<call>\())")
+# Fields of a method result that are copied to the top level of the step state
+_PROMOTED_FIELDS = ("explanation", "operation", "value")
+
+
+def _promote_fields(state: Dict[str, Any], result: Dict[str, Any], instance: Dict[str, Any]) -> None:
+    """Copy a method result's structured fields into the step state, with the stack it left behind"""
+    for field in _PROMOTED_FIELDS:
+        if field in result:
+            state[field] = result[field]
+    if "after_data" in result:
+        state["stack"] = result["after_data"]
+    elif instance.get("class_type") == ARRAY_STACK:
+        state["stack"] = instance.get("data", [])
 
 
 class StackStatementParser:
@@ -15,46 +37,56 @@ class StackStatementParser:
         self.method_executor = StackMethodExecutor(context)
         self.function_handler = StackFunctionHandler(context)
         self.node_manager = StackNodeManager(context)
+        # Last snapshot taken per container, shared by consecutive steps while unchanged
+        self._snapshots: Dict[Any, Any] = {}
     
     def execute_single_statement(self, line: str, line_number: int, step_number: int, 
                                  steps: List[ExecutionStepSchema], create_step_func) -> bool:
         """Execute a single statement with detailed tracking"""
+        head = _STATEMENT_HEAD_RE.match(line)
+        if head is None:
+            return False
+        kind = head.lastgroup
         
-        # Handle class instantiation
-        if self._handle_class_instantiation(line, line_number, step_number, steps, create_step_func):
-            return True
-        
-        # Handle method calls
-        if self._handle_method_calls(line, line_number, step_number, steps, create_step_func):
-            return True
-        
-        # Handle variable assignments from method calls
-        if self._handle_assignment_from_method(line, line_number, step_number, steps, create_step_func):
-            return True
+        if kind == "assignment":
+            # The first '(' and '.' decide which assignment form the line can be
+            paren = line.find('(')
+            if paren < 0:
+                # Handle simple variable assignments
+                return self._handle_simple_assignment(line, line_number, step_number, steps, create_step_func)
+            
+            dot = line.find('.', 0, paren)
+            if dot >= 0:
+                # Handle variable assignments from method calls
+                return self._handle_assignment_from_method(line, line_number, step_number, steps, create_step_func)
+            
+            # Handle class instantiation
+            if self._handle_class_instantiation(line, line_number, step_number, steps, create_step_func):
+                return True
+            
+            # Handle function calls with assignment
+            return self._handle_function_calls(line, line_number, step_number, steps, create_step_func)
         
-        # Handle simple variable assignments
-        if self._handle_simple_assignment(line, line_number, step_number, steps, create_step_func):
-            return True
+        if kind == "attribute":
+            # Handle method calls
+            return self._handle_method_calls(line, line_number, step_number, steps, create_step_func)
         
         # Handle function calls
         if self._handle_function_calls(line, line_number, step_number, steps, create_step_func):
             return True
         
         # Handle print statements
-        if self.print_handler.handle_print_statement(line, line_number, step_number, steps, create_step_func):
-            return True
-        
-        return False
+        return self.print_handler.handle_print_statement(line, line_number, step_number, steps, create_step_func)
     
     def _handle_class_instantiation(self, line: str, line_number: int, step_number: int, 
                                    steps: List[ExecutionStepSchema], create_step_func) -> bool:
         """Handle class instantiation with better parsing"""
-        instantiation_match = re.match(r"(\w+)\s*=\s*(\w+)\s*\(\s*\)", line)
+        instantiation_match = _INSTANTIATION_RE.match(line)
         if instantiation_match:
             var_name = instantiation_match.group(1)
             class_name = instantiation_match.group(2)
             
-            if class_name == "ArrayStack":
+            if class_name == ARRAY_STACK:
                 message = self.node_manager.create_instance(var_name, class_name)
                 state = self._create_current_state()
                 state["step_detail"] = {
@@ -75,7 +107,7 @@ class StackStatementParser:
     def _handle_method_calls(self, line: str, line_number: int, step_number: int, 
                             steps: List[ExecutionStepSchema], create_step_func) -> bool:
         """Handle method calls with instance tracking"""
-        method_match = re.match(r"(\w+)\.(\w+)\s*\((.*?)\)", line)
+        method_match = _METHOD_CALL_RE.match(line)
         if method_match:
             instance_name = method_match.group(1)
             method_name = method_match.group(2)
@@ -84,8 +116,6 @@ class StackStatementParser:
             if instance_name in self.context["instances"]:
                 instance = self.context["instances"][instance_name]
                 result = self.method_executor.execute_method(instance, instance_name, method_name, params)
-                state = self._create_current_state()
-                state["step_detail"] = result
                 
                 # Special handling for printStack method to show print output
                 if method_name == "printStack" and "stdout" in result:
@@ -97,32 +127,13 @@ class StackStatementParser:
                         "output": result["stdout"],
                         "method_call": True
                     }
-                    # Promote fields
-                    if "explanation" in result:
-                        print_state["explanation"] = result["explanation"]
-                    if "operation" in result:
-                        print_state["operation"] = result["operation"]
-                    if "value" in result:
-                        print_state["value"] = result["value"]
-                    if "after_data" in result:
-                        print_state["stack"] = result["after_data"]
-                    elif instance.get("class_type") == "ArrayStack":
-                        print_state["stack"] = instance.get("data", [])
-                        
+                    _promote_fields(print_state, result, instance)
                     steps.append(create_step_func(step_number, line_number, line, f"Print: {result['stdout']}", print_state))
                 else:
-                    # Promote fields
-                    if "explanation" in result:
-                        state["explanation"] = result["explanation"]
-                    if "operation" in result:
-                        state["operation"] = result["operation"]
-                    if "value" in result:
-                        state["value"] = result["value"]
-                    if "after_data" in result:
-                        state["stack"] = result["after_data"]
-                    elif instance.get("class_type") == "ArrayStack":
-                        state["stack"] = instance.get("data", [])
-                        
+                    # Only the step that is emitted gets a snapshot
+                    state = self._create_current_state(self._shared_snapshot(instance_name, result))
+                    state["step_detail"] = result
+                    _promote_fields(state, result, instance)
                     steps.append(create_step_func(step_number, line_number, line, result["message"], state))
                 return True
         return False
@@ -130,7 +141,7 @@ class StackStatementParser:
     def _handle_assignment_from_method(self, line: str, line_number: int, step_number: int, 
                                       steps: List[ExecutionStepSchema], create_step_func) -> bool:
         """Handle variable assignments from method calls"""
-        assignment_match = re.match(r"(\w+)\s*=\s*(\w+)\.(\w+)\s*\((.*?)\)", line)
+        assignment_match = _ASSIGNMENT_FROM_METHOD_RE.match(line)
         if assignment_match:
             var_name = assignment_match.group(1)
             instance_name = assignment_match.group(2)
@@ -140,28 +151,16 @@ class StackStatementParser:
             if instance_name in self.context["instances"]:
                 instance = self.context["instances"][instance_name]
                 
-                if method_name == "pop" and instance.get("class_type") == "ArrayStack":
+                if method_name == "pop" and instance.get("class_type") == ARRAY_STACK:
                     result = self.node_manager.stack_pop(instance, instance_name)
                     if result.get("value") is not None:
                         self.context["variables"][var_name] = result["value"]
                         result["message"] = f"Assigned {var_name} = {instance_name}.pop() → {result['value']}"
                         result["assignment"] = {"variable": var_name, "value": result["value"]}
                     
-                    state = self._create_current_state()
+                    state = self._create_current_state(self._shared_snapshot(instance_name, result))
                     state["step_detail"] = result
-                    
-                    # Promote fields
-                    if "explanation" in result:
-                        state["explanation"] = result["explanation"]
-                    if "operation" in result:
-                        state["operation"] = result["operation"]
-                    if "value" in result:
-                        state["value"] = result["value"]
-                    if "after_data" in result:
-                        state["stack"] = result["after_data"]
-                    elif instance.get("class_type") == "ArrayStack":
-                        state["stack"] = instance.get("data", [])
-                        
+                    _promote_fields(state, result, instance)
                     steps.append(create_step_func(step_number, line_number, line, result["message"], state))
                     return True
         return False
@@ -169,7 +168,7 @@ class StackStatementParser:
     def _handle_simple_assignment(self, line: str, line_number: int, step_number: int, 
                                  steps: List[ExecutionStepSchema], create_step_func) -> bool:
         """Handle simple variable assignments"""
-        simple_assignment_match = re.match(r"(\w+)\s*=\s*(.+)", line)
+        simple_assignment_match = _SIMPLE_ASSIGNMENT_RE.match(line)
         if simple_assignment_match and not line.count('.') and not line.count('('):
             var_name = simple_assignment_match.group(1)
             value_str = simple_assignment_match.group(2).strip()
@@ -195,7 +194,7 @@ class StackStatementParser:
         """Handle function calls with better tracking"""
         
         # Function call with assignment
-        assignment_func_match = re.match(r"(\w+)\s*=\s*(\w+)\((.*?)\)", line)
+        assignment_func_match = _ASSIGNMENT_FUNC_RE.match(line)
         if assignment_func_match:
             var_name = assignment_func_match.group(1)
             func_name = assignment_func_match.group(2)
@@ -217,7 +216,7 @@ class StackStatementParser:
                 return True
         
         # Direct function call
-        func_call_match = re.match(r"(\w+)\((.*?)\)", line)
+        func_call_match = _DIRECT_FUNC_RE.match(line)
         if func_call_match:
             func_name = func_call_match.group(1)
             args = func_call_match.group(2)
@@ -256,24 +255,72 @@ class StackStatementParser:
         
         return False
     
-    def _create_current_state(self) -> Dict[str, Any]:
-        """Create current state snapshot for step tracking"""
-        state = {
-            "instances": {},
-            "variables": self.context["variables"].copy(),
-            "stdout": self.context["stdout"].copy(),
-            "active": self.context.get("active_instance")
-        }
-        
+    def _shared_snapshot(self, instance_name: str, result: Dict[str, Any]) -> Optional[Dict[str, List[Any]]]:
+        """The copy of the instance's data a push or pop result already holds, to reuse in the state snapshot"""
+        after_data = result.get("after_data")
+        if after_data is None:
+            return None
+        return {instance_name: after_data}
+    
+    def _create_current_state(self, snapshots: Optional[Dict[str, List[Any]]] = None) -> Dict[str, Any]:
+        """
+        Create current state snapshot for step tracking
+
+        snapshots maps instance names to copies of their current data taken for this step;
+        those lists are shared instead of copied again, and nothing mutates them afterwards.
+        """
         # Add detailed instance states
+        instance_states = {}
         for name, instance in self.context["instances"].items():
-            if instance.get("class_type") == "ArrayStack":
-                state["instances"][name] = {
-                    "type": "ArrayStack",
-                    "data": instance["data"].copy(),
-                    "size": len(instance["data"]),
-                    "isEmpty": len(instance["data"]) == 0,
-                    "top": instance["data"][-1] if instance["data"] else None
-                }
+            if instance.get("class_type") == ARRAY_STACK:
+                instance_states[name] = self._stack_state(name, instance, snapshots.get(name) if snapshots else None)
+        # Usually every stack display was reused, so the previous mapping can be shared as well
+        previous_states = self._snapshots.get("instances")
+        if (previous_states is not None and len(previous_states) == len(instance_states)
+                and all(previous_states.get(name) is state for name, state in instance_states.items())):
+            instance_states = previous_states
+        else:
+            self._snapshots["instances"] = instance_states
         
-        return state
\ No newline at end of file
+        return {
+            "instances": instance_states,
+            "variables": self._snapshot("variables", self.context["variables"]),
+            "stdout": self._snapshot("stdout", self.context["stdout"]),
+            "active": self.context.get("active_instance")
+        }
+    
+    def _snapshot(self, key: Any, container: Any) -> Any:
+        """Return a shallow copy of container, reusing the previous copy while it holds the same objects"""
+        previous = self._snapshots.get(key)
+        # Compare by identity: 1, 1.0 and True are equal but must not share a snapshot
+        if previous is not None and len(previous) == len(container):
+            if isinstance(container, dict):
+                unchanged = all(old_name == name and old is value for (old_name, old), (name, value)
+                                in zip(previous.items(), container.items()))
+            else:
+                unchanged = all(old is value for old, value in zip(previous, container))
+            if unchanged:
+                return previous
+        snapshot = container.copy()
+        self._snapshots[key] = snapshot
+        return snapshot
+    
+    def _stack_state(self, name: str, instance: Dict[str, Any], data: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Display state of an ArrayStack, rebuilt only after its data was mutated"""
+        key = ("stack", name)
+        mutations = instance.get("_mutations")
+        cached = self._snapshots.get(key)
+        if cached is not None and mutations is not None and cached[0] is instance and cached[1] == mutations:
+            return cached[2]
+        
+        if data is None:
+            data = instance["data"].copy()
+        stack_state = {
+            "type": "ArrayStack",
+            "data": data,
+            "size": len(data),
+            "isEmpty": not data,
+            "top": data[-1] if data else None
+        }
+        self._snapshots[key] = (instance, mutations, stack_state)
+        return stack_state
@@ -3,6 +3,7 @@ from datetime import datetime
 from app.schemas.playground import ExecutionStepSchema
 from app.services.simulators.common.base_simulator import BaseSimulator, FunctionDefinitionTracker
 from app.services.simulators.stack.enhanced_stack_operation_parser import EnhancedStackOperationParser
+from app.services.simulators.stack.stack_node_manager import ARRAY_STACK
 from app.services.simulators.operations.ast_parser import ASTParser
 from app.services.simulators.operations.error_handler import ErrorHandler
 from app.services.simulators.direct_code_executor import DirectCodeExecutor
@@ -354,7 +355,7 @@ class StackSimulator(BaseSimulator):
     
     def _get_instance_display(self, instance):
         """Get display representation of stack instances"""
-        if instance.get("class_type") == "ArrayStack":
+        if instance.get("class_type") == ARRAY_STACK:
             return {
                 "type": "ArrayStack",
                 "data": instance.get("data", []),
@@ -0,0 +1,178 @@
+"""
+Fork server used by PersistentWorkerPool (see worker_pool.py).
+
+Runs as a standalone script, never imported by the app. The interpreter and the
+modules the execution wrappers import are loaded once; every run is then forked
+from this warm process, so each run still gets a process of its own. Nothing from
+one run is kept here, so a run cannot find another run's code in its memory.
+
+Frames read from stdin:  b"<code bytes> <stdin bytes> <output limit>\\n" + code + stdin data
+Frames written to stdout: b"<exit code> <stdout bytes> <stderr bytes> <truncated>\\n" + stdout + stderr
+"""
+import atexit
+import builtins
+import os
+import selectors
+import sys
+import threading
+import traceback
+import types
+
+# Warm up what the wrappers in real_python_executor / interactive_python_executor import
+import contextlib  # noqa: F401
+import inspect  # noqa: F401
+import io  # noqa: F401
+import json  # noqa: F401
+import re  # noqa: F401
+import time  # noqa: F401
+import tracemalloc  # noqa: F401
+
+_READ_SIZE = 65536
+
+
+def _exit_code(exc: SystemExit) -> int:
+    """Exit status for a SystemExit, the way the interpreter reports it"""
+    code = exc.code
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _run_child(code: str, stdin_fd: int, stdout_fd: int, stderr_fd: int, stream_settings) -> None:
+    """Execute code as `python -c` would, with the pipes as its standard streams; never returns"""
+    os.dup2(stdin_fd, 0)
+    os.dup2(stdout_fd, 1)
+    os.dup2(stderr_fd, 2)
+    for fd in (stdin_fd, stdout_fd, stderr_fd):
+        os.close(fd)
+
+    (in_encoding, in_errors), (out_encoding, out_errors), (err_encoding, err_errors) = stream_settings
+    sys.stdin = sys.__stdin__ = open(0, "r", encoding=in_encoding, errors=in_errors, closefd=False)
+    sys.stdout = sys.__stdout__ = open(1, "w", encoding=out_encoding, errors=out_errors, closefd=False)
+    sys.stderr = sys.__stderr__ = open(2, "w", buffering=1, encoding=err_encoding, errors=err_errors,
+                                       closefd=False)
+    for stream, name in ((sys.stdin, "<stdin>"), (sys.stdout, "<stdout>"), (sys.stderr, "<stderr>")):
+        stream.buffer.raw.name = name
+
+    # A fresh __main__ so nothing from this loop is visible to the run
+    main = types.ModuleType("__main__")
+    main.__dict__["__builtins__"] = builtins
+    sys.modules["__main__"] = main
+
+    exit_code = 0
+    try:
+        exec(compile(code, "<string>", "exec"), main.__dict__)
+    except SystemExit as exc:
+        exit_code = _exit_code(exc)
+    except BaseException as exc:
+        # Leave this function's frame out, like the traceback of `python -c`
+        traceback.print_exception(type(exc), exc, exc.__traceback__.tb_next)
+        exit_code = 1
+
+    # Shut down the way the interpreter does: wait for non-daemon threads, then run atexit hooks
+    try:
+        threading._shutdown()
+    except BaseException:
+        pass
+    try:
+        atexit._run_exitfuncs()
+    except BaseException:
+        pass
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except BaseException:
+            pass
+    os._exit(exit_code & 0xFF)
+
+
+def _run(code: str, stdin_data: bytes, output_limit: int, stream_settings):
+    """Fork one run and collect its exit code, stdout and stderr (each cut at output_limit bytes)"""
+    stdin_read, stdin_write = os.pipe()
+    stdout_read, stdout_write = os.pipe()
+    stderr_read, stderr_write = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:
+        # The child must never fall back into the server loop
+        try:
+            for fd in (stdin_write, stdout_read, stderr_read):
+                os.close(fd)
+            _run_child(code, stdin_read, stdout_write, stderr_write, stream_settings)
+        finally:
+            os._exit(1)
+
+    for fd in (stdin_read, stdout_write, stderr_write):
+        os.close(fd)
+
+    # Feed stdin and drain both outputs together, like Popen.communicate;
+    # past the limit output is still read, so the run never blocks, but dropped
+    truncated = False
+    outputs = {stdout_read: bytearray(), stderr_read: bytearray()}
+    pending = memoryview(stdin_data)
+    with selectors.DefaultSelector() as selector:
+        if pending:
+            os.set_blocking(stdin_write, False)
+            selector.register(stdin_write, selectors.EVENT_WRITE)
+        else:
+            os.close(stdin_write)
+        for fd in outputs:
+            selector.register(fd, selectors.EVENT_READ)
+
+        while selector.get_map():
+            for key, _ in selector.select():
+                fd = key.fd
+                if fd == stdin_write:
+                    try:
+                        pending = pending[os.write(fd, pending[:_READ_SIZE]):]
+                    except BrokenPipeError:
+                        pending = pending[:0]
+                    if not pending:
+                        selector.unregister(fd)
+                        os.close(fd)
+                    continue
+                chunk = os.read(fd, _READ_SIZE)
+                if chunk:
+                    output = outputs[fd]
+                    room = output_limit - len(output)
+                    if len(chunk) > room:
+                        chunk = chunk[:max(room, 0)]
+                        truncated = True
+                    output += chunk
+                else:
+                    selector.unregister(fd)
+                    os.close(fd)
+
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status), bytes(outputs[stdout_read]), bytes(outputs[stderr_read]), truncated
+
+
+def main() -> None:
+    frames_in = sys.stdin.buffer
+    frames_out = sys.stdout.buffer
+    # Runs get standard streams set up like the ones this interpreter started with
+    stream_settings = tuple((stream.encoding, stream.errors) for stream in (sys.stdin, sys.stdout, sys.stderr))
+    sys.argv = ["-c"]
+
+    while True:
+        header = frames_in.readline()
+        if not header:
+            return
+        code_size, stdin_size, output_limit = map(int, header.split())
+        code = frames_in.read(code_size).decode("utf-8")
+        stdin_data = frames_in.read(stdin_size)
+
+        exit_code, stdout, stderr, truncated = _run(code, stdin_data, output_limit, stream_settings)
+        frames_out.write(b"%d %d %d %d\n" % (exit_code, len(stdout), len(stderr), truncated))
+        frames_out.write(stdout)
+        frames_out.write(stderr)
+        frames_out.flush()
+        # Drop this run's data before the next fork, so the next run cannot reach it
+        del code, stdin_data, stdout, stderr
+
+
+if __name__ == "__main__":
+    main()
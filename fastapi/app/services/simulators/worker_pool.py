@@ -0,0 +1,164 @@
+import os
+import selectors
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+# The fork server each pooled worker runs; started through runpy so sys.path stays as with `python -c`
+_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker_loop.py")
+_BOOTSTRAP = "import runpy, sys; runpy.run_path(sys.argv.pop(1), run_name='__main__')"
+_READ_SIZE = 65536
+_MAX_IDLE_WORKERS = 4
+_MAX_WORKERS = 8
+
+
+class WorkerPoolError(Exception):
+    """A pooled worker could not be started or stopped answering"""
+
+
+class WorkerStartError(WorkerPoolError):
+    """No worker took the run, so none of the code has been executed"""
+
+
+class _Worker:
+    """One warm fork server process"""
+
+    def __init__(self):
+        try:
+            self.process = subprocess.Popen(
+                [sys.executable, "-c", _BOOTSTRAP, _WORKER_SCRIPT],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=0,
+                # Its own process group, so a timeout can kill the server and the run it forked
+                start_new_session=True
+            )
+        except OSError as e:
+            raise WorkerStartError(f"cannot start worker: {e}") from e
+
+    def request(self, code: bytes, stdin_data: bytes, output_limit: int,
+                deadline: float) -> Optional[Tuple[int, bytes, bytes, bool]]:
+        """Send one run; returns (exit code, stdout, stderr, truncated), or None if the deadline passed"""
+        try:
+            self.process.stdin.write(b"%d %d %d\n" % (len(code), len(stdin_data), output_limit) + code + stdin_data)
+        except OSError as e:
+            # The server only runs a fully received request, so nothing has run yet
+            raise WorkerStartError(f"worker is gone: {e}") from e
+
+        buffer = bytearray()
+        header = None
+        fd = self.process.stdout.fileno()
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while True:
+                if header is None and b"\n" in buffer:
+                    line, _, rest = bytes(buffer).partition(b"\n")
+                    header = tuple(int(part) for part in line.split())
+                    buffer = bytearray(rest)
+                if header is not None and len(buffer) >= header[1] + header[2]:
+                    exit_code, stdout_size, stderr_size, truncated = header
+                    return (exit_code, bytes(buffer[:stdout_size]),
+                            bytes(buffer[stdout_size:stdout_size + stderr_size]), bool(truncated))
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    return None
+                chunk = os.read(fd, _READ_SIZE)
+                if not chunk:
+                    raise WorkerPoolError("worker exited mid-run")
+                buffer += chunk
+
+    def kill(self) -> None:
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            stream.close()
+
+
+class PersistentWorkerPool:
+    """
+    Pool of warm fork servers for running code in a fresh process without interpreter start-up.
+
+    Each run is forked from an idle server, so runs stay isolated from one another;
+    only the interpreter and stdlib imports are shared, and they are paid for once.
+    At most max_workers servers are alive; a run that finds them all busy is refused with
+    WorkerStartError, so the caller can run it another way.
+    """
+
+    def __init__(self, max_idle: int = _MAX_IDLE_WORKERS, max_workers: int = _MAX_WORKERS):
+        self.max_idle = max_idle
+        self.max_workers = max_workers
+        self._idle: List[_Worker] = []
+        self._lock = threading.Lock()
+        # One slot per live server that is running a request; idle servers give theirs back
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+    def run(self, code: str, stdin_data: bytes, timeout: float,
+            output_limit: int) -> Tuple[bytes, bytes, int, bool, bool]:
+        """
+        Run code with stdin_data; returns (stdout, stderr, exit_code, timed_out, truncated),
+        output undecoded and each stream cut at output_limit bytes.
+        Raises WorkerStartError if the run never reached a worker
+        """
+        code_bytes = code.encode("utf-8")
+        deadline = time.monotonic() + timeout
+
+        if not self._slots.acquire(blocking=False):
+            raise WorkerStartError("all workers are busy")
+        try:
+            worker = self._checkout()
+            try:
+                response = worker.request(code_bytes, stdin_data, output_limit, deadline)
+            except BaseException:
+                worker.kill()
+                raise
+            if response is None:
+                worker.kill()
+                return b"", b"", -1, True, False
+            self._checkin(worker)
+        finally:
+            self._slots.release()
+
+        exit_code, stdout, stderr, truncated = response
+        return stdout, stderr, exit_code, False, truncated
+
+    def _checkout(self) -> _Worker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.poll() is None:
+                    return worker
+                worker.kill()
+        return _Worker()
+
+    def _checkin(self, worker: _Worker) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(worker)
+                return
+        worker.kill()
+
+
+_pool: Optional[PersistentWorkerPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> Optional[PersistentWorkerPool]:
+    """The pool for this process, or None where fork servers are not available"""
+    global _pool, _pool_pid
+    if not hasattr(os, "fork"):
+        return None
+    with _pool_lock:
+        # A forked server process (e.g. a gunicorn worker) must not share its parent's pipes
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = PersistentWorkerPool()
+            _pool_pid = os.getpid()
+        return _pool
@@ -25,6 +25,7 @@ MESSAGES = {
     "insert_last": "เพิ่มข้อมูล '{data}' ที่ตำแหน่งท้ายของ linked list",
     "insert_before": "เพิ่มข้อมูล '{new_data}' ก่อน '{target_name}' ใน linked list",
     "insert_before_head": "เพิ่มข้อมูล '{new_data}' ก่อน '{target_name}' ใน linked list",
+    "insert_many": "เพิ่มข้อมูล {count} ตัว ({data}) ที่ตำแหน่งท้ายของ linked list",
     "target_not_found": "ไม่พบข้อมูล '{target_name}' ใน linked list",
     
     # Delete operations (using frontend drag & drop style)
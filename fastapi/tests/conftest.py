@@ -118,4 +118,16 @@ def syntax_error_code_missing_colon():
     def __init__(self, name):
         self.name = name""",
         "dataType": "singlylinkedlist"
-    }
\ No newline at end of file
+    }
+
+@pytest.fixture
+def simulator_context():
+    """Empty simulator context, shaped like the one the simulators start from"""
+    return {"instances": {}, "variables": {}, "stdout": [], "active_instance": None}
+
+@pytest.fixture
+def create_step():
+    """Step factory for the statement parsers that keeps each step's line, message and state"""
+    def create(step_number, line_number, code, message=None, state=None, error=None):
+        return {"line": line_number, "message": message, "state": state}
+    return create
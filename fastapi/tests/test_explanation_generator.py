@@ -0,0 +1,31 @@
+"""
+Tests for batch explanations in ExplanationGenerator
+"""
+from app.services.simulators.operations.explanation_generator import ExplanationGenerator
+
+
+def test_generate_explanations_matches_single_calls():
+    steps = [
+        {"code_line": "  s = ArrayStack()"},
+        {"code_line": "s.push(1)", "operation": "PUSH",
+         "prev_state": {"data": []}, "curr_state": {"data": [1]}},
+        {"code_line": "x = s.pop()", "operation": "pop", "variables": {"x": 1},
+         "prev_state": {"data": [1]}, "curr_state": {"data": []}},
+        {"code_line": "q.enqueue(2)", "operation": "enqueue"},
+        {"code_line": "mylist.insert_last('A')", "operation": "insert"},
+        {"code_line": "mylist.delete_node('A')", "operation": "delete"},
+        {"code_line": "print(x)", "operation": "print", "variables": {"x": 1}},
+        {"code_line": "for i in range(3):"},
+        {"code_line": "x += 1", "operation": None},
+    ]
+    for ds_type in [None, "stack", "queue", "singly_linked_list"]:
+        generator = ExplanationGenerator(ds_type)
+        expected = [
+            generator.generate_explanation(
+                step["code_line"], step.get("operation"), step.get("variables"),
+                step.get("prev_state"), step.get("curr_state"),
+            )
+            for step in steps
+        ]
+        assert generator.generate_explanations(steps) == expected, ds_type
+    assert ExplanationGenerator().generate_explanations([]) == []
@@ -0,0 +1,129 @@
+"""
+Tests for linked list operations in NodeManager
+"""
+import pytest
+
+from app.services.simulators.operations.node_manager import NodeManager
+
+
+def _names(context, instance):
+    """Walk the list from head and return node names in order"""
+    names = []
+    current = instance["head"]
+    while current is not None:
+        node = context["nodes"][current]
+        names.append(node["name"])
+        current = node["next"]
+    return names
+
+
+@pytest.fixture
+def linked_list(simulator_context):
+    manager = NodeManager(simulator_context)
+    manager.create_instance("mylist", "SinglyLinkedList")
+    return simulator_context, manager, simulator_context["instances"]["mylist"]
+
+
+def test_insert_before_and_delete(linked_list):
+    context, manager, instance = linked_list
+    manager.insert_last(instance, "A")
+    manager.insert_last(instance, "C")
+    manager.insert_before(instance, "C", "B")
+    manager.insert_before(instance, "A", "Z")
+    assert _names(context, instance) == ["Z", "A", "B", "C"]
+
+    manager.delete_node(instance, "Z")
+    manager.delete_node(instance, "B")
+    assert _names(context, instance) == ["A", "C"]
+    assert instance["count"] == 2
+
+
+def test_duplicate_names_use_first_in_list_order(linked_list):
+    context, manager, instance = linked_list
+    manager.insert_last(instance, "A")
+    manager.insert_last(instance, "B")
+    manager.insert_front(instance, "B")
+    manager.delete_node(instance, "B")
+    assert _names(context, instance) == ["A", "B"]
+
+
+def test_missing_target_leaves_list_unchanged(linked_list):
+    context, manager, instance = linked_list
+    manager.insert_last(instance, "A")
+    manager.insert_before(instance, "X", "B")
+    manager.delete_node(instance, "X")
+    assert _names(context, instance) == ["A"]
+    assert instance["count"] == 1
+
+
+def test_index_rebuilt_after_manual_linking(linked_list):
+    context, manager, instance = linked_list
+    manager.create_node("n1", "A")
+    manager.create_node("n2", "B")
+    manager.set_attribute("mylist", "head", "n1")
+    manager.set_chained_attribute("mylist", "n2")
+    manager.insert_before(instance, "B", "C")
+    assert _names(context, instance) == ["A", "C", "B"]
+
+
+def test_index_rebuilt_after_shared_node_changes(linked_list):
+    context, manager, first = linked_list
+    manager.create_instance("other", "SinglyLinkedList")
+    other = context["instances"]["other"]
+    manager.create_node("r", "C")
+    manager.set_attribute("mylist", "head", "r")
+    manager.insert_before(first, "Q", "W")  # builds mylist's index
+    manager.insert_last(other, "D")
+    manager.set_chained_attribute("other", "r")  # other now runs into mylist's nodes
+    manager.insert_last(other, "B")  # appends to the shared node, so to mylist too
+    manager.insert_before(first, "B", "Z")
+    assert _names(context, first) == ["C", "Z", "B"]
+    assert _names(context, other) == ["D", "C", "Z", "B"]
+
+
+def test_tail_follows_last_node(linked_list):
+    context, manager, instance = linked_list
+    manager.insert_front(instance, "B")
+    assert context["nodes"][instance["tail"]]["name"] == "B"
+    manager.insert_last(instance, "C")
+    manager.delete_node(instance, "C")
+    assert context["nodes"][instance["tail"]]["name"] == "B"
+    manager.insert_last(instance, "D")
+    assert _names(context, instance) == ["B", "D"]
+    manager.delete_node(instance, "B")
+    manager.delete_node(instance, "D")
+    assert instance["head"] is None and instance["tail"] is None
+
+
+def test_insert_last_after_shared_tail_grew(linked_list):
+    context, manager, first = linked_list
+    manager.create_instance("other", "SinglyLinkedList")
+    other = context["instances"]["other"]
+    manager.create_node("r", "C")
+    manager.set_attribute("mylist", "head", "r")
+    manager.insert_last(other, "D")
+    manager.set_chained_attribute("other", "r")
+    manager.insert_last(other, "E")  # other's tail is now E
+    manager.insert_last(first, "F")  # grows the shared tail through mylist
+    manager.insert_last(other, "G")  # must append after F, not overwrite E's link
+    assert _names(context, other) == ["D", "C", "E", "F", "G"]
+    assert _names(context, first) == ["C", "E", "F", "G"]
+
+    # A tail that has gained a successor is never appended through, even with a current index
+    manager.delete_node(first, "missing")
+    first["tail"] = first["head"]
+    manager.insert_last(first, "H")
+    assert _names(context, first) == ["C", "E", "F", "G", "H"]
+
+
+def test_build_from_iterable_appends_in_order(linked_list):
+    context, manager, instance = linked_list
+    manager.insert_last(instance, "A")
+    manager.build_from_iterable(instance, ["B", "C", "D"])
+    assert _names(context, instance) == ["A", "B", "C", "D"]
+    assert instance["count"] == 4
+    assert context["nodes"][instance["tail"]]["name"] == "D"
+
+    manager.insert_before(instance, "C", "X")
+    manager.insert_last(instance, "E")
+    assert _names(context, instance) == ["A", "B", "X", "C", "D", "E"]
@@ -0,0 +1,36 @@
+"""
+Tests for print statement handling in PrintHandler
+"""
+from app.services.simulators.operations.print_handler import PrintHandler
+
+
+def test_print_step_receives_state_with_detail(simulator_context, create_step):
+    simulator_context["variables"]["x"] = 3
+    steps = []
+
+    assert PrintHandler(simulator_context).handle_print_statement('print("x =", x)', 1, 1, steps, create_step)
+    assert simulator_context["stdout"] == ["x = 3"]
+    assert steps[0]["state"]["step_detail"]["arguments"] == ['"x ="', "x"]
+
+
+def test_print_state_skipped_for_factories_that_build_their_own(simulator_context):
+    steps = []
+
+    def create_own_step(step_number, line_number, code, message=None, error=None, additional_state=None):
+        return (message, error, additional_state)
+
+    handler = PrintHandler(simulator_context, step_state=False)
+    assert handler.handle_print_statement('print("hello, world")', 1, 1, steps, create_own_step)
+    assert steps == [("Print: hello, world", None, None)]
+
+
+def test_print_steps_show_current_values(simulator_context, create_step):
+    handler = PrintHandler(simulator_context)
+    steps = []
+    for number, value in enumerate([1, True, 1.0, 1], 1):
+        simulator_context["variables"]["x"] = value
+        assert handler.handle_print_statement("print(x)", number, number, steps, create_step)
+
+    shown = [step["state"]["variables"]["x"] for step in steps]
+    assert [(type(value), value) for value in shown] == [(int, 1), (bool, True), (float, 1.0), (int, 1)]
+    assert simulator_context["stdout"] == ["1", "True", "1.0", "1"]
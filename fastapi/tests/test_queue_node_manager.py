@@ -0,0 +1,48 @@
+"""
+Tests for ArrayQueue operations in QueueNodeManager
+"""
+import pytest
+
+from app.services.simulators.queue.queue_node_manager import QueueNodeManager
+
+_OPS = ["enqueue", "enqueue", "dequeue", "enqueue", "dequeue", "dequeue", "dequeue"]
+_VALUES = [1, 2, None, 3, None, None, None]
+
+
+@pytest.fixture
+def manager(simulator_context):
+    manager = QueueNodeManager(simulator_context)
+    manager.create_instance("q", "ArrayQueue")
+    return manager
+
+
+def test_replay_batch_matches_single_operations(simulator_context, manager):
+    manager.create_instance("single", "ArrayQueue")
+    batched, single = simulator_context["instances"]["q"], simulator_context["instances"]["single"]
+
+    result = manager.queue_replay_batch(batched, _OPS, _VALUES, "q")
+    for op, value in zip(_OPS, _VALUES):
+        if op == "enqueue":
+            manager.queue_enqueue(single, value, "single")
+        else:
+            manager.queue_dequeue(single, "single")
+
+    assert list(batched["data"]) == list(single["data"]) == []
+    assert batched["history"] == single["history"]
+    assert result["value"] == [1, 2, 3]
+    assert result["error"] == "underflow" and result["skipped"] == 1
+
+
+def test_history_recording_can_be_disabled(simulator_context, manager):
+    simulator_context["record_history"] = False
+    queue = simulator_context["instances"]["q"]
+    result = manager.queue_enqueue(queue, 1, "q")
+    manager.queue_enqueue(queue, 2, "q")
+    assert "before_data" not in result and "after_data" not in result
+    assert manager.queue_dequeue(queue, "q")["value"] == 1
+    assert list(queue["data"]) == [2]
+
+    result = manager.queue_replay_batch(queue, _OPS, _VALUES, "q")
+    assert "before_data" not in result and "after_data" not in result
+    assert result["value"] == [2, 1, 2, 3]
+    assert queue["history"] == []
@@ -0,0 +1,63 @@
+"""
+Tests for statement dispatch in QueueStatementParser
+"""
+import pytest
+
+from app.services.simulators.operations.print_handler import PrintHandler
+from app.services.simulators.queue.queue_statement_parser import QueueStatementParser
+
+
+@pytest.fixture
+def parser(simulator_context):
+    return QueueStatementParser(simulator_context, PrintHandler(simulator_context))
+
+
+def _run(parser, lines, create_step):
+    steps = []
+    for number, line in enumerate(lines, 1):
+        assert parser.execute_single_statement(line, number, number, steps, create_step), line
+    return steps
+
+
+def test_trailing_comments_are_ignored(simulator_context, parser, create_step):
+    steps = _run(parser, [
+        "q = ArrayQueue()  # new queue",
+        "q.enqueue(1)  # (first)",
+        "q.enqueue(2)",
+        "x = q.dequeue()  # x == 1",
+        'name = "a"',
+    ], create_step)
+
+    assert list(simulator_context["instances"]["q"]["data"]) == [2]
+    assert simulator_context["variables"] == {"x": 1, "name": "a"}
+    assert steps[-1]["state"]["instances"]["q"]["front"] == 2
+
+
+def test_unrecognised_lines_are_rejected(parser, create_step):
+    steps = []
+    for line in ["return x", "x = y.z", "for i in range(3):"]:
+        assert not parser.execute_single_statement(line, 1, 1, steps, create_step)
+    assert steps == []
+
+
+def test_print_shows_queue_data_as_a_list(simulator_context, parser, create_step):
+    _run(parser, ["q = ArrayQueue()", "q.enqueue(1)", "q.enqueue(2)", "print(q.data)", "print(q.data, q.size)"],
+         create_step)
+
+    assert simulator_context["stdout"] == ["[1, 2]", "[1, 2] 2"]
+
+
+def test_snapshots_follow_reassigned_values(simulator_context, parser, create_step):
+    steps = _run(parser, ["q = ArrayQueue()"], create_step)
+    # 1, True and 1.0 compare equal, but each step must show the value it ran with
+    for number, value in enumerate([1, True, 1.0], 2):
+        simulator_context["variables"]["x"] = value
+        assert parser.execute_single_statement("q.size()", number, number, steps, create_step)
+    assert parser.execute_single_statement("q.enqueue(1)", 5, 5, steps, create_step)
+
+    shown = [step["state"]["variables"]["x"] for step in steps[1:4]]
+    assert [(type(value), value) for value in shown] == [(int, 1), (bool, True), (float, 1.0)]
+    # Unchanged queues share one snapshot mapping until the queue changes
+    assert steps[2]["state"]["instances"] is steps[1]["state"]["instances"]
+    assert steps[4]["state"]["instances"] is not steps[3]["state"]["instances"]
+    assert steps[4]["state"]["instances"]["q"]["data"] == [1]
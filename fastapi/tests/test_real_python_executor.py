@@ -0,0 +1,139 @@
+"""
+Tests for RealPythonExecutor runs through the worker pool
+"""
+import threading
+import time
+
+import pytest
+
+from app.services.simulators.real_python_executor import RealPythonExecutor
+from app.services.simulators.worker_pool import PersistentWorkerPool, WorkerStartError
+
+
+def test_pool_matches_new_interpreter():
+    code = "import sys\nprint(sum(range(10)))\nprint('oops', file=sys.stderr)\nsys.exit(3)"
+    pooled = RealPythonExecutor().execute_with_subprocess(code, skip_wrapping=True)
+    fresh = RealPythonExecutor(use_worker_pool=False).execute_with_subprocess(code, skip_wrapping=True)
+
+    assert pooled == fresh
+    assert (pooled.stdout, pooled.stderr, pooled.exit_code) == ("45", "oops\n", 3)
+
+
+def test_pool_reports_compile_problems_like_new_interpreter():
+    for code in ["x = (1,\nprint(x)", "print(1 is 1)", "print(1)"]:
+        for _ in range(2):
+            pooled = RealPythonExecutor().execute_with_subprocess(code, skip_wrapping=True)
+            fresh = RealPythonExecutor(use_worker_pool=False).execute_with_subprocess(code, skip_wrapping=True)
+            assert pooled == fresh, code
+
+
+def test_pooled_runs_are_isolated():
+    executor = RealPythonExecutor()
+    executor.execute("leaked = 1")
+    result = executor.execute("print('leaked' in globals())")
+
+    assert result.output["output"] == "False"
+
+
+def test_pooled_runs_cannot_reach_earlier_runs():
+    executor = RealPythonExecutor()
+    executor.execute_with_subprocess("print('earlier-' + 'run-marker')", skip_wrapping=True)
+    # Look through every frame and live code object the fork server handed down
+    probe = (
+        "import gc, sys\n"
+        "def hits():\n"
+        "    marker = '-'.join(['earlier', 'run', 'marker'])\n"
+        "    frame, found = sys._getframe(1), 0\n"
+        "    while frame:\n"
+        "        found += any(marker in repr(value) for value in list(frame.f_locals.values()))\n"
+        "        frame = frame.f_back\n"
+        "    return found + sum(marker in repr(o) for o in gc.get_objects())\n"
+        "print(hits())"
+    )
+    result = executor.execute_with_subprocess(probe, skip_wrapping=True)
+
+    assert result.stdout == "0"
+
+
+def test_pooled_run_waits_for_threads():
+    code = ("import atexit, threading, time\n"
+            "atexit.register(lambda: print('at exit'))\n"
+            "threading.Thread(target=lambda: (time.sleep(0.2), print('from thread'))).start()\n"
+            "print('main done')")
+    pooled = RealPythonExecutor().execute_with_subprocess(code, skip_wrapping=True)
+    fresh = RealPythonExecutor(use_worker_pool=False).execute_with_subprocess(code, skip_wrapping=True)
+
+    assert pooled == fresh
+    assert pooled.stdout == "main done\nfrom thread\nat exit"
+
+
+def test_pooled_run_reads_stdin():
+    result = RealPythonExecutor().execute_with_subprocess(
+        "print(input()[::-1])", stdin_data="abc\n", skip_wrapping=True)
+
+    assert result.stdout == "cba"
+
+
+def test_pooled_run_times_out():
+    executor = RealPythonExecutor(timeout=1)
+    result = executor.execute("while True:\n    pass")
+
+    assert result.timed_out
+    assert executor.execute("print(1)").output["output"] == "1"
+
+
+def test_worker_lost_mid_run_is_not_rerun(tmp_path):
+    runs = tmp_path / "runs"
+    runs.touch()
+    # The first run kills its fork server; a fallback would run the code a second time
+    code = (
+        "import os, signal\n"
+        f"with open({str(runs)!r}, 'a+') as f:\n"
+        "    f.seek(0)\n"
+        "    first = not f.read()\n"
+        "    f.write('ran\\n')\n"
+        "if first:\n"
+        "    os.killpg(0, signal.SIGKILL)"
+    )
+    result = RealPythonExecutor().execute_with_subprocess(code, skip_wrapping=True)
+
+    assert runs.read_text() == "ran\n"
+    assert result.exit_code == -1 and "worker exited mid-run" in result.stderr
+
+
+def test_pool_caps_live_workers(tmp_path):
+    pool = PersistentWorkerPool(max_workers=1)
+    running = tmp_path / "running"
+    code = f"import time\nopen({str(running)!r}, 'w').close()\ntime.sleep(2)"
+    threading.Thread(target=pool.run, args=(code, b"", 10, 1024)).start()
+    while not running.exists():
+        time.sleep(0.01)
+
+    # The only worker is busy, so the run is refused before anything is sent
+    with pytest.raises(WorkerStartError):
+        pool.run("print(1)", b"", 10, 1024)
+
+
+def test_result_cache_is_opt_in():
+    code = "import time\nprint(time.time_ns())"
+    executor = RealPythonExecutor()
+    assert executor.execute(code).output != executor.execute(code).output
+
+    cached = RealPythonExecutor(cache_enabled=True)
+    first = cached.execute(code)
+    assert cached.execute(code) is first
+    assert cached.execute(code, stdin_data='{"x": 1}') is not first
+
+
+def test_output_is_capped():
+    code = "print('x' * (3 << 20))"
+    pooled = RealPythonExecutor().execute_with_subprocess(code, skip_wrapping=True)
+    fresh = RealPythonExecutor(use_worker_pool=False).execute_with_subprocess(code, skip_wrapping=True)
+
+    assert pooled == fresh
+    assert len(pooled.stdout) == 1 << 20
+    assert pooled.stderr.endswith("[output truncated to 1048576 bytes]\n")
+
+    small = RealPythonExecutor(max_output_bytes=4).execute_with_subprocess(code, skip_wrapping=True)
+    assert small.stdout == "xxxx"
+    assert small.stderr.endswith("[output truncated to 4 bytes]\n")
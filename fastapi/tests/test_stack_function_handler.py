@@ -0,0 +1,48 @@
+"""
+Tests for the simulated helper functions in StackFunctionHandler
+"""
+import pytest
+
+from app.services.simulators.stack.stack_function_handler import StackFunctionHandler
+
+
+@pytest.fixture
+def handler(simulator_context):
+    return StackFunctionHandler(simulator_context)
+
+
+def test_parentheses_matching(simulator_context, handler):
+    simulator_context["variables"]["expr"] = "(a+(b*c))"
+    cases = {
+        "'(a+(b*c))'": True,
+        "expr": True,
+        "'a + b'": True,
+        "'((a)'": False,
+        "'(('": False,
+        # Unmatched ')' are counted up, so a pair of them still balances
+        "'))'": True,
+        "')('": False,
+    }
+    for args, expected in cases.items():
+        assert handler.simulate_function_call("is_parentheses_matching", args) is expected, args
+
+    assert simulator_context["stdout"] == [
+        "Parentheses in ((a) are unmatched",
+        "Parentheses in (( are unmatched",
+        "Parentheses in )( are unmatched",
+    ]
+
+
+def test_copy_stack_snapshots_do_not_follow_later_changes(simulator_context, handler):
+    simulator_context["instances"]["s1"] = {"data": [1, 2], "history": []}
+    simulator_context["instances"]["s2"] = {"data": [9], "history": []}
+
+    result = handler.simulate_function_call("copyStack", "s1, s2")
+    simulator_context["instances"]["s1"]["data"].append(3)
+    simulator_context["instances"]["s2"]["data"].pop()
+
+    assert simulator_context["instances"]["s2"]["data"] == [1]
+    assert result["source_before"] == result["source_after"] == [1, 2]
+    assert result["destination_before"] == [9]
+    assert result["destination_after"] == [1, 2]
+    assert simulator_context["instances"]["s2"]["history"][-1] == {"operation": "copyStack", "before": [9], "after": [1, 2]}
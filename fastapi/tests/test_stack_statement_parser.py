@@ -0,0 +1,70 @@
+"""
+Tests for statement dispatch in StackStatementParser
+"""
+import pytest
+
+from app.services.simulators.operations.print_handler import PrintHandler
+from app.services.simulators.stack.stack_statement_parser import StackStatementParser
+
+
+@pytest.fixture
+def parser(simulator_context):
+    return StackStatementParser(simulator_context, PrintHandler(simulator_context))
+
+
+def _run(parser, lines, create_step):
+    steps = []
+    for number, line in enumerate(lines, 1):
+        assert parser.execute_single_statement(line, number, number, steps, create_step), line
+    return steps
+
+
+def test_statement_forms_are_dispatched(simulator_context, parser, create_step):
+    steps = _run(parser, [
+        "s = ArrayStack()",
+        "s.push(1)",
+        "s.push(2)",
+        "x = s.pop()",
+        'name = "a"',
+        "print(x)",
+    ], create_step)
+
+    assert simulator_context["instances"]["s"]["data"] == [1]
+    assert simulator_context["variables"] == {"x": 2, "name": "a"}
+    assert simulator_context["stdout"] == ["2"]
+    assert steps[3]["state"]["stack"] == [1]
+    # The popped result's after_data is the snapshot, not another copy of it
+    assert steps[3]["state"]["instances"]["s"]["data"] is steps[3]["state"]["stack"]
+
+
+def test_unrecognised_lines_are_rejected(parser, create_step):
+    steps = []
+    for line in ["return x", "x = 5", "x = y.pop()", "t.push(1)", "for i in range(3):"]:
+        assert not parser.execute_single_statement(line, 1, 1, steps, create_step)
+    assert steps == []
+
+
+def test_snapshots_follow_stack_changes(parser, create_step):
+    steps = _run(parser, ["s = ArrayStack()", "s.push(1)", "s.push(2)", "s.stackTop()", "print(s.pop())", "s.size()"],
+                 create_step)
+
+    snapshots = [step["state"]["instances"]["s"] for step in steps]
+    # Unchanged stacks share one snapshot, and a pop inside print() still invalidates it
+    assert snapshots[3] is snapshots[2]
+    assert snapshots[5]["data"] == [1]
+    assert [snapshot["data"] for snapshot in snapshots[:4]] == [[], [1], [1, 2], [1, 2]]
+
+
+def test_snapshots_follow_reassigned_values(simulator_context, parser, create_step):
+    steps = _run(parser, ["s = ArrayStack()"], create_step)
+    # 1, True and 1.0 compare equal, but each step must show the value it ran with
+    for number, value in enumerate([1, True, 1.0], 2):
+        simulator_context["variables"]["x"] = value
+        assert parser.execute_single_statement("s.size()", number, number, steps, create_step)
+    assert parser.execute_single_statement("s.push(1)", 5, 5, steps, create_step)
+
+    shown = [step["state"]["variables"]["x"] for step in steps[1:4]]
+    assert [(type(value), value) for value in shown] == [(int, 1), (bool, True), (float, 1.0)]
+    # Unchanged stacks share one snapshot mapping until the stack changes
+    assert steps[2]["state"]["instances"] is steps[1]["state"]["instances"]
+    assert steps[4]["state"]["instances"] is not steps[3]["state"]["instances"]